@@ -0,0 +1,264 @@
+import contextlib
+import math
+import time
+
+try:
+    import batch
+except ImportError:
+    # numpy 2 is optional, without it moves are scored one by one
+    batch = None
+from board import Board, CROSS, ZERO
+from book import OpeningBook
+from evaluation import evaluate
+from movegen import iter_unique_moves, make_move, unmake_move, unique_moves
+from rules import Move, Position
+from solver import EndgameSolver, SolverStopped
+from tablebase import Tablebase
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+WIN_SCORE = 1_000_000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def terminal_score(board: Board, player: int, ply: int) -> int:
+    """Score of a finished game for player, faster wins score higher."""
+    cross_won, zero_won, draw = board.conditions()
+    if draw:
+        return 0
+    winner = CROSS if cross_won else ZERO
+    if winner == player:
+        return WIN_SCORE - ply
+    return ply - WIN_SCORE
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """Win scores count plies from the root, the table keeps them from the node."""
+    if score > WIN_SCORE - 100:
+        return score + ply
+    if score < 100 - WIN_SCORE:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score > WIN_SCORE - 100:
+        return score - ply
+    if score < 100 - WIN_SCORE:
+        return score + ply
+    return score
+
+
+def ordered_moves(board: Board) -> list:
+    """Unique moves sorted by evaluate, in a single batch if numpy is available."""
+    if batch is not None:
+        return batch.ordered_moves(board)
+    return unique_moves(board, evaluate)
+
+
+class AlphaBetaEngine:
+    """
+    Negamax with alpha-beta pruning and iterative deepening. search()
+    always returns in about time_limit seconds with the best move of
+    the deepest finished iteration.
+
+    Positions with at most solve_empty empty cells go to the endgame
+    solver first, with half of the time. If it fails to finish the
+    iterative deepening gets the rest. Positions in the opening book of
+    the database book_path or in the tablebase directory tablebase_path
+    are answered without searching.
+    """
+
+    def __init__(
+            self,
+            time_limit: float = 1.0,
+            max_depth: int = 36,
+            table_bits: int = 20,
+            solve_empty: int = 6,
+            book_path: str | None = None,
+            tablebase_path: str | None = None,
+    ) -> None:
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.table = TranspositionTable(table_bits)
+        self.solver = EndgameSolver(solve_empty, table_bits - 2, evaluate)
+        self.solution = None
+        self.book = None if book_path is None else OpeningBook(book_path)
+        self.tablebase = None if tablebase_path is None else Tablebase(tablebase_path)
+        self.nodes = 0
+        self.depth = 0
+        self.score = 0
+        # Event or worker.StopFlag, the search stops once it is set
+        self.stop_event = None
+        self._deadline = 0.0
+
+    def search(self, position: Position, time_limit: float | None = None) -> Move | None:
+        if position.is_terminal():
+            return None
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        if self.book is not None:
+            entry = self.book.probe(position.board())
+            if entry is not None:
+                move, self.score = entry
+                self.nodes = 0
+                self.depth = 0
+                return move
+
+        if self.tablebase is not None:
+            entry = self.tablebase.best_move(position)
+            if entry is not None:
+                value, move = entry
+                self.score = value * WIN_SCORE
+                self.nodes = 0
+                self.depth = position.empty_cells
+                return move
+
+        self._deadline = time.monotonic() + time_limit
+        self.solution = None
+        if self.solver.can_solve(position):
+            self.solver.stop_event = self.stop_event
+            try:
+                self.solution = self.solver.solve(position, time_limit / 2)
+            except SolverStopped:
+                pass
+            else:
+                self.nodes = self.solution.nodes
+                self.depth = position.empty_cells
+                self.score = self.solution.value * WIN_SCORE
+                return self.solution.move
+
+        board = position.board()
+        self.nodes = 0
+        self.depth = 0
+        self.table.new_search()
+        moves = ordered_moves(board)
+        best_move = moves[0]
+
+        for depth in range(1, min(self.max_depth, position.empty_cells) + 1):
+            try:
+                score, move = self._search_root(board, moves, depth)
+            except SearchTimeout:
+                break
+
+            best_move = move
+            self.depth = depth
+            self.score = score
+            if abs(score) > WIN_SCORE - 36:
+                break
+
+            # the best move of this iteration is searched first in the next one
+            moves.remove(move)
+            moves.insert(0, move)
+
+        return best_move
+
+    def ponder(self, position: Position) -> Move | None:
+        """
+        Searches the opponent's position until stop_event is set. The
+        results stay in the transposition table, which the search after
+        the opponent's actual move probes by canonical hash. Returns the
+        predicted opponent's move.
+        """
+        return self.search(position, math.inf)
+
+    def _search_root(self, board: Board, moves: list, depth: int) -> (int, Move):
+        alpha = -WIN_SCORE - 1
+        best_move = moves[0]
+        for move in moves:
+            score = self._score_move(board, move, depth, alpha, WIN_SCORE + 1, 0)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return alpha, best_move
+
+    def _negamax(self, board: Board, depth: int, alpha: int, beta: int, ply: int) -> int:
+        if time.monotonic() > self._deadline or (
+            self.stop_event is not None and self.stop_event.is_set()
+        ):
+            raise SearchTimeout
+
+        original_alpha = alpha
+        table_move = None
+        entry = self.table.probe(board)
+        if entry is not None:
+            entry_depth, bound, value, table_move = entry
+            if entry_depth >= depth:
+                value = score_from_table(value, ply)
+                if bound == EXACT:
+                    return value
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        best = -WIN_SCORE - 1
+        best_move = None
+        if depth == 1:
+            # leaf children are scored right where move generation makes them
+            player = board.player
+            # closing() unmakes the current move right at a cutoff
+            with contextlib.closing(iter_unique_moves(board)) as moves:
+                for move in moves:
+                    self.nodes += 1
+                    if any(board.conditions()):
+                        score = terminal_score(board, player, ply + 1)
+                    else:
+                        score = evaluate(board, player)
+                    if score > best:
+                        best = score
+                        best_move = move
+                        if score > alpha:
+                            alpha = score
+                            if alpha >= beta:
+                                break
+        else:
+            moves = ordered_moves(board)
+            if table_move is not None and table_move in moves:
+                moves.remove(table_move)
+                moves.insert(0, table_move)
+
+            for move in moves:
+                score = self._score_move(board, move, depth, alpha, beta, ply)
+                if score > best:
+                    best = score
+                    best_move = move
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            break
+
+        if best <= original_alpha:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(board, depth, bound, score_to_table(best, ply), best_move)
+        return best
+
+    def _score_move(
+            self,
+            board: Board,
+            move: Move,
+            depth: int,
+            alpha: int,
+            beta: int,
+            ply: int,
+    ) -> int:
+        self.nodes += 1
+        player = board.player
+        make_move(board, move)
+        if any(board.conditions()):
+            score = terminal_score(board, player, ply + 1)
+        elif depth <= 1:
+            score = evaluate(board, player)
+        else:
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+        unmake_move(board, move)
+        return score
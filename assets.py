@@ -21,11 +21,11 @@ class Asset:
 
     @property
     def normal_path(self) -> str:
-        return os.path.join(settings.img_path, self.normal_filename)
+        return os.path.join(settings.variant_img_path, self.normal_filename)
 
     @property
     def hovered_path(self) -> str:
-        return os.path.join(settings.img_path, self.hovered_filename)
+        return os.path.join(settings.variant_img_path, self.hovered_filename)
 
     @property
     def base_path(self) -> str:
@@ -37,7 +37,7 @@ class Asset:
 
     @property
     def clicked_path(self) -> str:
-        return os.path.join(settings.img_path, self.clicked_filename)
+        return os.path.join(settings.variant_img_path, self.clicked_filename)
 
 
 class Assets:
@@ -58,6 +58,7 @@ class Assets:
         return asset
 
     def _create_imgs(self, asset: Asset) -> None:
+        os.makedirs(settings.variant_img_path, exist_ok=True)
         save_flag = False
         if (
             asset.normal_filename is None
@@ -86,7 +87,7 @@ class Assets:
     def _create_normal_img(self, asset: Asset) -> None:
         normal_filename = self._normal_filename(asset.name)
         input_path = asset.base_path
-        output_path = os.path.join(settings.img_path, normal_filename)
+        output_path = os.path.join(settings.variant_img_path, normal_filename)
         if asset.themeable:
             self.img_creator.create_themeable_img(input_path, output_path)
         else:
@@ -97,7 +98,7 @@ class Assets:
     def _create_hovered_img(self, asset: Asset) -> None:
         hovered_filename = self._hovered_filename(asset.name)
         input_path = asset.base_path
-        output_path = os.path.join(settings.img_path, hovered_filename)
+        output_path = os.path.join(settings.variant_img_path, hovered_filename)
 
         self.img_creator.create_hovered_img(input_path, output_path)
         asset.hovered_filename = hovered_filename
@@ -105,7 +106,7 @@ class Assets:
     def _create_clicked_img(self, asset: Asset) -> None:
         clicked_filename = asset.base_clicked_filename
         input_path = asset.base_clicked_path
-        output_path = os.path.join(settings.img_path, clicked_filename)
+        output_path = os.path.join(settings.variant_img_path, clicked_filename)
         self.img_creator.create_themeable_img(input_path, output_path)
         asset.clicked_filename = clicked_filename
 
@@ -117,13 +118,9 @@ class Assets:
             clicked_filename=asset.clicked_filename,
         )
 
-    def update_assets(self) -> None:
-        for asset in self.assets.values():
-            self._create_normal_img(asset)
-            if asset.hoverable:
-                self._create_hovered_img(asset)
-            if asset.clickable:
-                self._create_clicked_img(asset)
+    def refresh(self, asset: Asset) -> None:
+        """Creates the image files of asset for the current theme and scale if they are missing."""
+        self._create_imgs(asset)
 
     @staticmethod
     def _normal_filename(asset_name: str) -> str:
@@ -0,0 +1,96 @@
+import numpy as np
+
+from board import Board, CROSS, ZERO, LINE_MASKS
+from evaluation import LINE_WEIGHTS
+from movegen import iter_unique_moves
+from rules import DRAW
+
+if not hasattr(np, "bitwise_count"):
+    # numpy 1.x imports fine but cannot count bits, importers fall back
+    # to scoring moves one by one on ImportError
+    raise ImportError("batch needs numpy 2.0 or later for bitwise_count")
+
+# status of a position that is not finished, the others are CROSS, ZERO and DRAW
+ONGOING = -1
+# cell values of the (N, 36) form, cells are in board index order
+EMPTY = -1
+
+_LINES = np.array(LINE_MASKS, dtype=np.uint64)
+_BITS = np.uint64(1) << np.arange(36, dtype=np.uint64)
+_WEIGHTS = np.array(LINE_WEIGHTS, dtype=np.int64)
+
+
+def masks_from_cells(cells: np.ndarray) -> np.ndarray:
+    """(N, 36) array of CROSS, ZERO and EMPTY to (N, 2) uint64 array of cross and zero masks."""
+    cells = np.asarray(cells)
+    return np.stack(
+        [
+            np.bitwise_or.reduce(np.where(cells == player, _BITS, 0), axis=1)
+            for player in (CROSS, ZERO)
+        ],
+        axis=1,
+    ).astype(np.uint64)
+
+
+def cells_from_masks(masks: np.ndarray) -> np.ndarray:
+    masks = np.asarray(masks, dtype=np.uint64)
+    cells = np.full((len(masks), 36), EMPTY, dtype=np.int8)
+    for player in (CROSS, ZERO):
+        cells[(masks[:, player, None] & _BITS) != 0] = player
+    return cells
+
+
+def line_counts(masks: np.ndarray) -> np.ndarray:
+    """(N, 2, 32) stones of every player on every line."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    return np.bitwise_count(masks[:, :, None] & _LINES).astype(np.int8)
+
+
+def evaluate(masks: np.ndarray, player: int | np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Status and heuristic score of N positions given as an (N, 2) array
+    of cross and zero masks. status is ONGOING, CROSS, ZERO or DRAW,
+    by the same rules as Board.conditions. score is evaluation.evaluate for
+    player, a single player or one per position, and 0 for finished
+    positions.
+    """
+    masks = np.asarray(masks, dtype=np.uint64)
+    counts = line_counts(masks)
+    cross, zero = counts[:, CROSS], counts[:, ZERO]
+
+    cross_won = (cross == 5).any(axis=1)
+    zero_won = (zero == 5).any(axis=1)
+    full = np.bitwise_count(masks[:, CROSS] | masks[:, ZERO]) == 36
+    status = np.full(len(masks), ONGOING, dtype=np.int8)
+    status[full] = DRAW
+    status[cross_won] = CROSS
+    status[zero_won] = ZERO
+    status[cross_won & zero_won] = DRAW
+
+    # lines which only one player has stones on
+    cross_score = np.where(zero == 0, _WEIGHTS[cross], 0).sum(axis=1)
+    zero_score = np.where(cross == 0, _WEIGHTS[zero], 0).sum(axis=1)
+    score = np.where(np.asarray(player) == CROSS, 1, -1) * (cross_score - zero_score)
+    score[status != ONGOING] = 0
+    return status, score
+
+
+def evaluate_cells(cells: np.ndarray, player: int | np.ndarray) -> (np.ndarray, np.ndarray):
+    return evaluate(masks_from_cells(cells), player)
+
+
+def ordered_moves(board: Board) -> list:
+    """
+    movegen.unique_moves(board, evaluation.evaluate) with all moves scored in
+    one evaluate() call.
+    """
+    player = board.player
+    moves = []
+    masks = []
+    for move in iter_unique_moves(board):
+        moves.append(move)
+        masks.append(board.masks.copy())
+    status, score = evaluate(np.array(masks, dtype=np.uint64), player)
+    # immediate wins first and immediate losses last, like unique_moves
+    key = np.where(status == player, 1 << 40, np.where(status == 1 - player, -1 << 40, score))
+    return [moves[i] for i in np.argsort(-key, kind="stable")]
@@ -0,0 +1,288 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+from board import Board, CROSS, ZERO, zobrist_hashes
+from movegen import generate_moves, make_move, unmake_move, unique_moves
+from rules import Position
+
+# name: (position, perft depth)
+POSITIONS = {
+    "start": ("." * 36, 2),
+    "opening": ("......................xo.....x.....o", 2),
+    "midgame": (".oo.x..x...xo..oo.x....o...xx..x.o..", 2),
+    "late": ("oxxo..xoxxoooxo.o.x.xx.oo.xoxo.x.x.o", 3),
+    "threats": ("xoxo.oooo.xxoxoxxxxoooo.xxx.xx..ooxo", 3),
+}
+
+
+class LegacyBoard:
+    """
+    The list-based rules the game used before Board: four 3x3 lists
+    like SubField.field_list, rotations like SubField.rotate_clockwise
+    and win detection like Field.win_draw_check over Field.unite. The
+    checks of cross on side diagonals and of a full board with a win
+    follow the fixed rules, so results can be compared with Board.
+    """
+
+    def __init__(self, field: list | None = None) -> None:
+        self.field = field or [[[None] * 3 for _ in range(3)] for _ in range(4)]
+
+    @classmethod
+    def from_board(cls, board: Board) -> "LegacyBoard":
+        legacy = cls()
+        for index in range(36):
+            quadrant, local = divmod(index, 9)
+            y, x = divmod(local, 3)
+            legacy.field[quadrant][y][x] = board.get(index)
+        return legacy
+
+    def copy(self) -> "LegacyBoard":
+        return LegacyBoard([[row.copy() for row in subfield] for subfield in self.field])
+
+    def place(self, index: int, sign: int) -> None:
+        quadrant, local = divmod(index, 9)
+        y, x = divmod(local, 3)
+        self.field[quadrant][y][x] = sign
+
+    def rotate(self, quadrant: int, clockwise: bool) -> None:
+        field_list = self.field[quadrant]
+        if clockwise:
+            self.field[quadrant] = [[field_list[2 - x][y] for x in range(3)] for y in range(3)]
+        else:
+            self.field[quadrant] = [[field_list[x][2 - y] for x in range(3)] for y in range(3)]
+
+    def unite(self) -> list:
+        res = [None] * 6
+        for i in range(3):
+            res[i] = self.field[0][i] + self.field[1][i]
+            res[3 + i] = self.field[2][i] + self.field[3][i]
+        return res
+
+    def win_draw_check(self) -> (bool, bool, bool):
+        type_field = self.unite()
+        won = {CROSS: False, ZERO: False}
+        for sign in (CROSS, ZERO):
+            for i in range(6):
+                # horizontal and vertical
+                if (
+                    [type_field[i][j] for j in range(5)].count(sign) == 5
+                    or [type_field[i][j] for j in range(1, 6)].count(sign) == 5
+                    or [type_field[j][i] for j in range(5)].count(sign) == 5
+                    or [type_field[j][i] for j in range(1, 6)].count(sign) == 5
+                ):
+                    won[sign] = True
+            # main and side diagonals
+            if any(
+                    (
+                        [type_field[i][i + 1] for i in range(5)].count(sign) == 5,
+                        [type_field[i][i] for i in range(5)].count(sign) == 5,
+                        [type_field[i][i] for i in range(1, 6)].count(sign) == 5,
+                        [type_field[i + 1][i] for i in range(5)].count(sign) == 5,
+                        [type_field[5 - i][i + 1] for i in range(5)].count(sign) == 5,
+                        [type_field[5 - i][i] for i in range(5)].count(sign) == 5,
+                        [type_field[5 - i][i] for i in range(1, 6)].count(sign) == 5,
+                        [type_field[4 - i][i] for i in range(5)].count(sign) == 5,
+                    )
+            ):
+                won[sign] = True
+
+        if won[CROSS] and won[ZERO]:
+            return False, False, True
+        full = all(all(i is not None for i in row) for row in type_field)
+        return won[CROSS], won[ZERO], full and not (won[CROSS] or won[ZERO])
+
+
+def perft(board: Board, depth: int) -> int:
+    """Number of move sequences of length depth, finished games have no moves."""
+    if depth == 0:
+        return 1
+    if any(board.conditions()):
+        return 0
+    moves = generate_moves(board)
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        make_move(board, move)
+        count += perft(board, depth - 1)
+        unmake_move(board, move)
+    return count
+
+
+def perft_unique(board: Board, depth: int) -> int:
+    """perft with unique_moves, every node only expands moves to distinct positions."""
+    if depth == 0:
+        return 1
+    if any(board.conditions()):
+        return 0
+    count = 0
+    for move in unique_moves(board):
+        make_move(board, move)
+        count += perft_unique(board, depth - 1)
+        unmake_move(board, move)
+    return count
+
+
+def legacy_perft(legacy: LegacyBoard, sign: int, depth: int) -> int:
+    """perft on copies of the lists, the way the old game changed its state."""
+    if depth == 0:
+        return 1
+    if any(legacy.win_draw_check()):
+        return 0
+    count = 0
+    for index in range(36):
+        quadrant, local = divmod(index, 9)
+        if legacy.field[quadrant][local // 3][local % 3] is not None:
+            continue
+        placed = legacy.copy()
+        placed.place(index, sign)
+        if any(placed.win_draw_check()):
+            count += depth == 1
+            continue
+        for quadrant in range(4):
+            for clockwise in (False, True):
+                rotated = placed.copy()
+                rotated.rotate(quadrant, clockwise)
+                count += legacy_perft(rotated, 1 - sign, depth - 1)
+    return count
+
+
+def timed(function, *args) -> (object, float):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def per_call(function, calls: int) -> float:
+    """Microseconds per call of function."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run_perft(legacy: bool) -> dict:
+    results = {}
+    for name, (string, depth) in POSITIONS.items():
+        position = Position.from_string(string)
+        board = position.board()
+        results[name] = {}
+        for d in range(1, depth + 1):
+            count, seconds = timed(perft, board, d)
+            unique_count, unique_seconds = timed(perft_unique, board, d)
+            result = {
+                "count": count,
+                "seconds": seconds,
+                "unique_count": unique_count,
+                "unique_seconds": unique_seconds,
+            }
+            if legacy:
+                legacy_count, legacy_seconds = timed(
+                    legacy_perft, LegacyBoard.from_board(board), board.player, d
+                )
+                if legacy_count != count:
+                    raise ValueError(
+                        f"perft {name} depth {d}: {count} positions, legacy {legacy_count}"
+                    )
+                result["legacy_count"] = legacy_count
+                result["legacy_seconds"] = legacy_seconds
+            results[name][d] = result
+            print(f"perft {name} {d}: {count} in {seconds:.3f} s, unique {unique_count}")
+    return results
+
+
+def run_timings(calls: int) -> dict:
+    """Microseconds per operation on every benchmark position."""
+    results = {}
+    for name, (string, _) in POSITIONS.items():
+        board = Position.from_string(string).board()
+        legacy = LegacyBoard.from_board(board)
+        cell = next(index for index in range(36) if board.is_empty(index))
+
+        def place_rotate_undo():
+            board.place(cell)
+            board.rotate(0, True)
+            board.undo()
+            board.undo()
+
+        def legacy_place_rotate():
+            placed = legacy.copy()
+            placed.place(cell, CROSS)
+            placed.rotate(0, True)
+
+        results[name] = {
+            "generate_moves": per_call(lambda: generate_moves(board), calls // 100),
+            "unique_moves": per_call(lambda: unique_moves(board), calls // 100),
+            "place_rotate_undo": per_call(place_rotate_undo, calls),
+            "legacy_place_rotate": per_call(legacy_place_rotate, calls),
+            "conditions": per_call(board.conditions, calls),
+            "legacy_win_draw_check": per_call(legacy.win_draw_check, calls // 10),
+            "zobrist_hashes": per_call(lambda: zobrist_hashes(*board.masks), calls // 10),
+            "canonical": per_call(board.canonical, calls),
+        }
+        print(
+            f"{name}: "
+            + ", ".join(f"{key} {value:.2f} us" for key, value in results[name].items())
+        )
+    return results
+
+
+def run(output: str, legacy: bool = True, calls: int = 10000) -> dict:
+    results = {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "perft": run_perft(legacy),
+        "timings_us": run_timings(calls),
+    }
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    return results
+
+
+def compare(results: dict, previous: dict) -> None:
+    """
+    Raises ValueError if perft counts differ from previous results and
+    prints how the timings changed.
+    """
+    # previous results come from JSON, so their depths are strings
+    for name, depths in results["perft"].items():
+        for depth, result in depths.items():
+            old = previous["perft"].get(name, {}).get(str(depth))
+            if old is not None and old["count"] != result["count"]:
+                raise ValueError(
+                    f"perft {name} depth {depth}: {result['count']} positions, "
+                    f"previously {old['count']}"
+                )
+    for name, timings in results["timings_us"].items():
+        old_timings = previous["timings_us"].get(name, {})
+        print(
+            f"{name}: "
+            + ", ".join(
+                f"{key} x{value / old_timings[key]:.2f}"
+                for key, value in timings.items() if old_timings.get(key)
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move generation and rules benchmarks.")
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument(
+        "--no-legacy", action="store_true", help="skip the perft of the list-based rules",
+    )
+    parser.add_argument("--calls", type=int, default=10000, help="calls per timing")
+    parser.add_argument("--compare", help="results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+    results = run(args.output, not args.no_legacy, args.calls)
+    if previous is not None:
+        compare(results, previous)
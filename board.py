@@ -0,0 +1,430 @@
+import random
+
+CROSS = 0
+ZERO = 1
+
+QUADRANT_MASK = 0b111111111
+FULL_MASK = (1 << 36) - 1
+
+
+def cell_index(quadrant: int, x: int, y: int) -> int:
+    return quadrant * 9 + y * 3 + x
+
+
+def index_from_row_col(row: int, col: int) -> int:
+    return cell_index((row // 3) * 2 + col // 3, col % 3, row % 3)
+
+
+def row_col_from_index(index: int) -> (int, int):
+    quadrant, local = divmod(index, 9)
+    y, x = divmod(local, 3)
+    return (quadrant // 2) * 3 + y, (quadrant % 2) * 3 + x
+
+
+def _rotated_local(local: int, clockwise: bool) -> int:
+    y, x = divmod(local, 3)
+    if clockwise:
+        return x * 3 + (2 - y)
+    return (2 - x) * 3 + y
+
+
+def _line(row: int, col: int, d_row: int, d_col: int) -> int:
+    mask = 0
+    for i in range(5):
+        mask |= 1 << index_from_row_col(row + i * d_row, col + i * d_col)
+    return mask
+
+
+# all 32 five-in-a-row lines: 12 horizontal, 12 vertical, 8 diagonal
+LINE_MASKS = (
+    tuple(_line(row, col, 0, 1) for row in range(6) for col in range(2))
+    + tuple(_line(row, col, 1, 0) for col in range(6) for row in range(2))
+    + tuple(_line(row, col, 1, 1) for row in range(2) for col in range(2))
+    + tuple(_line(row, col, 1, -1) for row in range(2) for col in range(4, 6))
+)
+
+
+def _rotated_pattern(pattern: int, clockwise: bool) -> int:
+    rotated = 0
+    for local in range(9):
+        if pattern >> local & 1:
+            rotated |= 1 << _rotated_local(local, clockwise)
+    return rotated
+
+
+# ROTATED[clockwise][pattern] is the 9-bit quadrant pattern after rotation
+ROTATED = (
+    tuple(_rotated_pattern(pattern, False) for pattern in range(512)),
+    tuple(_rotated_pattern(pattern, True) for pattern in range(512)),
+)
+
+
+# base-3 quadrant states, digit i of a state is 0 for an empty local
+# cell i, 1 for cross and 2 for zero, so the 3^9 states of a quadrant
+# index the tables below
+QUADRANT_STATES = 3 ** 9
+# TERNARY[pattern] is the state with ones where the 9-bit pattern has them
+TERNARY = tuple(
+    sum(3 ** local for local in range(9) if pattern >> local & 1) for pattern in range(512)
+)
+# PLACED[player][local] is added to a state by a stone of player on local
+PLACED = tuple(tuple((player + 1) * 3 ** local for local in range(9)) for player in (CROSS, ZERO))
+
+
+def quadrant_state(cross_pattern: int, zero_pattern: int) -> int:
+    return TERNARY[cross_pattern] + 2 * TERNARY[zero_pattern]
+
+
+def _state_patterns() -> list:
+    # digit 0 of a state is local cell 0, the other digits are a state
+    # of locals 1 to 8, so states are built up one digit at a time
+    patterns = [(0, 0)]
+    for _ in range(9):
+        patterns = [
+            (cross << 1 | (digit == 1), zero << 1 | (digit == 2))
+            for cross, zero in patterns
+            for digit in range(3)
+        ]
+    return patterns
+
+
+# packed line counts: one int with 4 bits per line and player, the stones
+# of player on line i are bits 8 * i + 4 * player, so counts of disjoint
+# stones add up field by field and a byte holds both counts of a line
+def _packed_counts(cross: int, zero: int) -> int:
+    packed = 0
+    for i, line in enumerate(LINE_MASKS):
+        packed |= ((cross & line).bit_count() | (zero & line).bit_count() << 4) << 8 * i
+    return packed
+
+
+# CELL_LINE_COUNTS[player][index] is added by a stone of player on index
+CELL_LINE_COUNTS = tuple(
+    tuple(_packed_counts(1 << index, 0) << 4 * player for index in range(36))
+    for player in (CROSS, ZERO)
+)
+
+# The tables over all quadrant states take a good part of a second to
+# build, so they start empty and are filled in place by _build_tables()
+# when the first Board is made. Importing the rules stays fast, and
+# modules which imported the names see the filled tables.
+# STATE_PATTERNS[state] is (cross pattern, zero pattern) of a state
+STATE_PATTERNS = []
+# ROTATED_STATES[clockwise][state] is the state after rotation
+ROTATED_STATES = ([], [])
+# QUADRANT_LINE_COUNTS[quadrant][state] are the packed line counts of the
+# stones of a quadrant, the counts of a board are the sum over quadrants
+QUADRANT_LINE_COUNTS = ([], [], [], [])
+
+
+def _build_tables() -> None:
+    STATE_PATTERNS.extend(_state_patterns())
+    for clockwise in (False, True):
+        rotated = ROTATED[clockwise]
+        ROTATED_STATES[clockwise].extend(
+            TERNARY[rotated[cross_pattern]] + 2 * TERNARY[rotated[zero_pattern]]
+            for cross_pattern, zero_pattern in STATE_PATTERNS
+        )
+    for quadrant in range(4):
+        shift = quadrant * 9
+        cross_counts = [_packed_counts(pattern << shift, 0) for pattern in range(512)]
+        zero_counts = [counts << 4 for counts in cross_counts]
+        QUADRANT_LINE_COUNTS[quadrant].extend(
+            cross_counts[cross_pattern] + zero_counts[zero_pattern]
+            for cross_pattern, zero_pattern in STATE_PATTERNS
+        )
+
+
+# adding 3 to every field turns a count of 5, and only that, into bit 3 of the field
+_THREES = sum(3 << 4 * field for field in range(64))
+_FIVES = tuple(sum(8 << 8 * i + 4 * player for i in range(32)) for player in (CROSS, ZERO))
+
+
+def packed_lines(cross: int, zero: int) -> int:
+    """Packed line counts of the board with the cross and zero masks."""
+    if not STATE_PATTERNS:
+        _build_tables()
+    return sum(
+        QUADRANT_LINE_COUNTS[quadrant][
+            quadrant_state(
+                cross >> quadrant * 9 & QUADRANT_MASK, zero >> quadrant * 9 & QUADRANT_MASK
+            )
+        ]
+        for quadrant in range(4)
+    )
+
+
+def line_count(packed: int, line: int, player: int) -> int:
+    return packed >> 8 * line + 4 * player & 15
+
+
+def has_five(packed: int, player: int) -> bool:
+    return bool(packed + _THREES & _FIVES[player])
+
+
+# the 8 rotations and reflections of the whole board as functions of
+# (row, col), reflections reverse the direction of quadrant rotations
+_SYMMETRY_FUNCTIONS = (
+    (lambda row, col: (row, col), False),
+    (lambda row, col: (col, 5 - row), False),
+    (lambda row, col: (5 - row, 5 - col), False),
+    (lambda row, col: (5 - col, row), False),
+    (lambda row, col: (row, 5 - col), True),
+    (lambda row, col: (5 - row, col), True),
+    (lambda row, col: (col, row), True),
+    (lambda row, col: (5 - col, 5 - row), True),
+)
+# SYMMETRIES[s][index] is the cell index maps to under symmetry s
+SYMMETRIES = tuple(
+    tuple(index_from_row_col(*function(*row_col_from_index(index))) for index in range(36))
+    for function, _ in _SYMMETRY_FUNCTIONS
+)
+QUADRANT_SYMMETRIES = tuple(
+    tuple(symmetry[quadrant * 9 + 4] // 9 for quadrant in range(4))
+    for symmetry in SYMMETRIES
+)
+SYMMETRY_FLIPS = tuple(flip for _, flip in _SYMMETRY_FUNCTIONS)
+INVERSE_SYMMETRIES = tuple(
+    next(
+        j for j, inverse in enumerate(SYMMETRIES)
+        if all(inverse[symmetry[index]] == index for index in range(36))
+    )
+    for symmetry in SYMMETRIES
+)
+
+
+def transform_mask(mask: int, symmetry: int) -> int:
+    permutation = SYMMETRIES[symmetry]
+    result = 0
+    while mask:
+        low = mask & -mask
+        result |= 1 << permutation[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+def transform_move(cell: int, quadrant: int | None, clockwise: bool, symmetry: int):
+    if quadrant is None:
+        return SYMMETRIES[symmetry][cell], None, clockwise
+    return (
+        SYMMETRIES[symmetry][cell],
+        QUADRANT_SYMMETRIES[symmetry][quadrant],
+        clockwise != SYMMETRY_FLIPS[symmetry],
+    )
+
+
+# Zobrist keys, ZOBRIST[player][s][index] is the key of a stone of player
+# on index as seen through symmetry s, so hashing a position under all 8
+# symmetries at once costs one xor per symmetry
+_random = random.Random(2023)
+_ZOBRIST_BASE = tuple(tuple(_random.getrandbits(64) for _ in range(36)) for _ in range(2))
+ZOBRIST = tuple(
+    tuple(
+        tuple(_ZOBRIST_BASE[player][symmetry[index]] for index in range(36))
+        for symmetry in SYMMETRIES
+    )
+    for player in (CROSS, ZERO)
+)
+
+
+def _quadrant_keys(keys: tuple, quadrant: int) -> tuple:
+    table = [0] * 512
+    for pattern in range(1, 512):
+        low = pattern & -pattern
+        table[pattern] = table[pattern ^ low] ^ keys[quadrant * 9 + low.bit_length() - 1]
+    return tuple(table)
+
+
+# QUADRANT_ZOBRIST[player][s][quadrant][pattern] is the xor of the keys of
+# a 9-bit quadrant pattern, a rotation changes hash by the keys of
+# old_pattern ^ new_pattern
+QUADRANT_ZOBRIST = tuple(
+    tuple(
+        tuple(_quadrant_keys(keys, quadrant) for quadrant in range(4))
+        for keys in player_keys
+    )
+    for player_keys in ZOBRIST
+)
+
+
+def zobrist_hashes(cross: int, zero: int) -> list:
+    hashes = [0] * 8
+    for player, mask in ((CROSS, cross), (ZERO, zero)):
+        for symmetry in range(8):
+            keys = ZOBRIST[player][symmetry]
+            for index in range(36):
+                if mask >> index & 1:
+                    hashes[symmetry] ^= keys[index]
+    return hashes
+
+
+class Board:
+    """
+    Pentago position as two 36-bit masks, one per player.
+
+    Bits are laid out quadrant by quadrant: the cell (x, y) of quadrant q
+    is bit q * 9 + y * 3 + x, so every quadrant is a contiguous 9-bit
+    pattern. Quadrants are numbered like Field.field: 0 top left,
+    1 top right, 2 bottom left, 3 bottom right.
+    """
+
+    def __init__(self, cross: int = 0, zero: int = 0) -> None:
+        if not STATE_PATTERNS:
+            _build_tables()
+        self.masks = [cross, zero]
+        self.history = []
+        # base-3 state of every quadrant and packed line counts of the board
+        self.states = [
+            quadrant_state(
+                cross >> quadrant * 9 & QUADRANT_MASK, zero >> quadrant * 9 & QUADRANT_MASK
+            )
+            for quadrant in range(4)
+        ]
+        self.lines = sum(
+            QUADRANT_LINE_COUNTS[quadrant][state] for quadrant, state in enumerate(self.states)
+        )
+        # Zobrist hash of the position under every symmetry
+        self.hashes = zobrist_hashes(cross, zero)
+
+    @property
+    def occupied(self) -> int:
+        return self.masks[CROSS] | self.masks[ZERO]
+
+    @property
+    def stones(self) -> int:
+        return self.occupied.bit_count()
+
+    @property
+    def player(self) -> int:
+        """Player who places the next stone, cross always starts."""
+        return self.stones & 1
+
+    def get(self, index: int) -> int | None:
+        bit = 1 << index
+        if self.masks[CROSS] & bit:
+            return CROSS
+        if self.masks[ZERO] & bit:
+            return ZERO
+        return None
+
+    def is_empty(self, index: int) -> bool:
+        return not self.occupied >> index & 1
+
+    def is_full(self) -> bool:
+        return self.occupied == FULL_MASK
+
+    def quadrant(self, quadrant: int, player: int) -> int:
+        return self.masks[player] >> quadrant * 9 & QUADRANT_MASK
+
+    def is_quadrant_empty(self, quadrant: int) -> bool:
+        return not self.occupied >> quadrant * 9 & QUADRANT_MASK
+
+    def canonical(self) -> (int, int):
+        """
+        Symmetry-independent hash of the position and the symmetry which
+        maps the position to its canonical form.
+        """
+        key = min(self.hashes)
+        return key, self.hashes.index(key)
+
+    def canonical_hash(self) -> int:
+        return min(self.hashes)
+
+    def line_counts(self, player: int) -> list:
+        """Stones of player on every line of LINE_MASKS."""
+        return [line_count(self.lines, line, player) for line in range(32)]
+
+    def winning_lines(self, player: int) -> tuple:
+        if not has_five(self.lines, player):
+            return ()
+        return tuple(i for i, count in enumerate(self.line_counts(player)) if count == 5)
+
+    def conditions(self) -> (bool, bool, bool):
+        """
+        (cross_won, zero_won, draw) in the same order as
+        Field.get_conditions. Five-in-a-rows of both players at once
+        and a full board without any line are draws.
+        """
+        cross_won = has_five(self.lines, CROSS)
+        zero_won = has_five(self.lines, ZERO)
+        if cross_won and zero_won:
+            return False, False, True
+        return cross_won, zero_won, not (cross_won or zero_won) and self.is_full()
+
+    def place(self, index: int) -> None:
+        if not 0 <= index < 36:
+            raise ValueError(f"invalid cell index: {index}")
+        if not self.is_empty(index):
+            raise ValueError(f"cell {index} is already occupied")
+        player = self.player
+        self.masks[player] |= 1 << index
+        self.history.append(index)
+        self._hash_cell(player, index)
+        self.states[index // 9] += PLACED[player][index % 9]
+        self.lines += CELL_LINE_COUNTS[player][index]
+
+    def rotate(self, quadrant: int, clockwise: bool) -> None:
+        if not 0 <= quadrant < 4:
+            raise ValueError(f"invalid quadrant: {quadrant}")
+        self._rotate(quadrant, clockwise)
+        self.history.append(36 + quadrant * 2 + clockwise)
+
+    def undo(self) -> None:
+        move = self.history.pop()
+        if move < 36:
+            player = CROSS if self.masks[CROSS] >> move & 1 else ZERO
+            self.masks[player] &= ~(1 << move)
+            self._hash_cell(player, move)
+            self.states[move // 9] -= PLACED[player][move % 9]
+            self.lines -= CELL_LINE_COUNTS[player][move]
+        else:
+            quadrant, clockwise = divmod(move - 36, 2)
+            self._rotate(quadrant, not clockwise)
+
+    def _rotate(self, quadrant: int, clockwise: bool) -> None:
+        state = self.states[quadrant]
+        rotated = ROTATED_STATES[clockwise][state]
+        if state == rotated:
+            return
+        self.states[quadrant] = rotated
+        line_counts = QUADRANT_LINE_COUNTS[quadrant]
+        self.lines += line_counts[rotated] - line_counts[state]
+
+        shift = quadrant * 9
+        hashes = self.hashes
+        for player, pattern, rotated_pattern in zip(
+                (CROSS, ZERO), STATE_PATTERNS[state], STATE_PATTERNS[rotated]
+        ):
+            changed = pattern ^ rotated_pattern
+            if not changed:
+                continue
+            self.masks[player] ^= changed << shift
+            for symmetry, keys in enumerate(QUADRANT_ZOBRIST[player]):
+                hashes[symmetry] ^= keys[quadrant][changed]
+
+    def _hash_cell(self, player: int, index: int) -> None:
+        hashes = self.hashes
+        for symmetry, keys in enumerate(ZOBRIST[player]):
+            hashes[symmetry] ^= keys[index]
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.masks = self.masks.copy()
+        board.history = self.history.copy()
+        board.states = self.states.copy()
+        board.lines = self.lines
+        board.hashes = self.hashes.copy()
+        return board
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Board) and self.masks == other.masks
+
+    def __hash__(self) -> int:
+        return hash(tuple(self.masks))
+
+    def __str__(self) -> str:
+        signs = {CROSS: "x", ZERO: "o", None: "."}
+        return "\n".join(
+            "".join(signs[self.get(index_from_row_col(row, col))] for col in range(6))
+            for row in range(6)
+        )
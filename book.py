@@ -0,0 +1,120 @@
+import sqlite3
+import sys
+import time
+
+from board import Board, INVERSE_SYMMETRIES, transform_move
+from movegen import iter_unique_moves
+from rules import Move, Position
+
+TABLE_NAME = "opening_book"
+# bytes of the database file sqlite maps into memory instead of reading
+MMAP_SIZE = 1 << 28
+
+
+def _signed(key: int) -> int:
+    """sqlite integers are signed 64-bit, Zobrist keys are unsigned."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class OpeningBook:
+    """
+    Best moves of opening positions, looked up by canonical hash in an
+    indexed sqlite table. The database file is memory-mapped and every
+    probe reads a single row, nothing is loaded up front. Moves are
+    stored in the canonical frame, like in the transposition table.
+    """
+
+    def __init__(self, db_filename: str) -> None:
+        self.con = sqlite3.connect(f"file:{db_filename}?mode=ro", uri=True)
+        self.con.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        self.available = self.con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLE_NAME,)
+        ).fetchone() is not None
+
+    def probe(self, board: Board) -> tuple | None:
+        """Best move and score for the player to move, None if board is not in the book."""
+        if not self.available:
+            return None
+        key, symmetry = board.canonical()
+        row = self.con.execute(
+            f"SELECT move, score FROM {TABLE_NAME} WHERE hash = ?", (_signed(key),)
+        ).fetchone()
+        if row is None:
+            return None
+        move = Move.from_code(row[0])
+        return Move(*transform_move(*move, INVERSE_SYMMETRIES[symmetry])), row[1]
+
+    def close(self) -> None:
+        self.con.close()
+
+
+def create_table(con: sqlite3.Connection) -> None:
+    # the primary key of a WITHOUT ROWID table is its index
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} (\n"
+        "    hash INTEGER PRIMARY KEY,\n"
+        "    move INTEGER NOT NULL,\n"
+        "    score INTEGER NOT NULL,\n"
+        "    depth INTEGER NOT NULL\n"
+        ") WITHOUT ROWID"
+    )
+
+
+def build(db_filename: str, plies: int, time_limit: float) -> int:
+    """
+    Searches every position up to plies plies from the start, one per
+    symmetry class, and stores the results. Positions already in the
+    book are kept, so an interrupted build continues where it stopped.
+    Returns the number of new entries.
+    """
+    # the engine is only needed offline
+    from ai import AlphaBetaEngine
+
+    con = sqlite3.connect(db_filename)
+    create_table(con)
+    engine = AlphaBetaEngine(time_limit, solve_empty=0)
+    added = 0
+
+    level = [Board()]
+    for ply in range(plies + 1):
+        next_level = {}
+        for board in level:
+            key, symmetry = board.canonical()
+            if con.execute(
+                f"SELECT 1 FROM {TABLE_NAME} WHERE hash = ?", (_signed(key),)
+            ).fetchone() is None:
+                start = time.monotonic()
+                move = engine.search(Position(*board.masks))
+                con.execute(
+                    f"INSERT INTO {TABLE_NAME} VALUES (?, ?, ?, ?)",
+                    (
+                        _signed(key),
+                        Move(*transform_move(*move, symmetry)).code,
+                        engine.score,
+                        engine.depth,
+                    ),
+                )
+                con.commit()
+                added += 1
+                print(
+                    f"ply {ply}: {move} score {engine.score} depth {engine.depth} "
+                    f"in {time.monotonic() - start:.1f} s"
+                )
+
+            if ply < plies:
+                for move in iter_unique_moves(board):
+                    if not any(board.conditions()):
+                        next_level.setdefault(board.canonical_hash(), board.copy())
+        level = list(next_level.values())
+
+    con.close()
+    return added
+
+
+if __name__ == "__main__":
+    # python book.py <db file> [plies] [seconds per position]
+    build(
+        sys.argv[1],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 2.0,
+    )
@@ -5,6 +5,7 @@ import os.path
 from assets import assets
 from themes import themes
 from settings import settings
+from surfaces import surfaces
 
 
 class Data:
@@ -12,6 +13,7 @@ class Data:
         self.settings = settings
         self.assets = assets
         self.themes = themes
+        self.surfaces = surfaces
         self.score = Score.from_json()
 
     def save(self):
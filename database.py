@@ -1,5 +1,4 @@
 import sqlite3
-import os
 
 from settings import settings
 
@@ -50,4 +49,4 @@ class Database:
         cur.close()
 
 
-database = Database(os.path.join(settings.data_folder, settings.db_filename))
+database = Database(settings.db_path)
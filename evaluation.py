@@ -0,0 +1,34 @@
+import sys
+
+from board import Board, CROSS, ZERO
+
+# score of a line free of opponent stones by the number of own stones on it
+LINE_WEIGHTS = (0, 1, 4, 16, 64, 0)
+
+
+def _line_scores(player: int) -> tuple:
+    scores = [0] * 256
+    for cross in range(6):
+        for zero in range(6):
+            own, other = (cross, zero) if player == CROSS else (zero, cross)
+            if not other:
+                scores[cross | zero << 4] = LINE_WEIGHTS[own]
+            elif not own:
+                scores[cross | zero << 4] = -LINE_WEIGHTS[other]
+    return tuple(scores)
+
+
+# LINE_SCORES[player][byte] scores one byte of Board.lines, the counts of
+# cross and zero on a line, for player
+LINE_SCORES = (_line_scores(CROSS), _line_scores(ZERO))
+# LINE_PAIR_SCORES[player][word] scores two neighbouring bytes at once
+LINE_PAIR_SCORES = tuple(
+    tuple(scores[word & 255] + scores[word >> 8] for word in range(1 << 16))
+    for scores in LINE_SCORES
+)
+
+
+def evaluate(board: Board, player: int) -> int:
+    """Heuristic score of a non-terminal board for player."""
+    words = memoryview(board.lines.to_bytes(32, sys.byteorder)).cast("H")
+    return sum(map(LINE_PAIR_SCORES[player].__getitem__, words))
@@ -0,0 +1,81 @@
+import bisect
+import itertools
+import typing
+
+import pygame
+
+
+class HitGrid:
+    """
+    Uniform grid over sprite rects for hit tests. Every grid cell keeps
+    the sprites overlapping it ordered by when they were added, later
+    ones are drawn on top. A lookup only tests the sprites of the one
+    grid cell under the point, however many sprites there are.
+
+    Sprites need a rect and a collide(pos) method. Moved sprites have
+    to be passed to move().
+    """
+
+    def __init__(self, cell_size: int = 64) -> None:
+        self.cell_size = cell_size
+        # (column, row): [(order, sprite), ...] sorted by order
+        self.cells = {}
+        # sprite: (order, keys of its cells)
+        self.entries = {}
+        self._counter = itertools.count()
+
+    def _keys(self, rect: pygame.Rect) -> list:
+        # collide() includes the right and bottom edges
+        size = self.cell_size
+        return [
+            (column, row)
+            for column in range(rect.left // size, rect.right // size + 1)
+            for row in range(rect.top // size, rect.bottom // size + 1)
+        ]
+
+    def _insert(self, sprite, order: int) -> None:
+        keys = self._keys(sprite.rect)
+        for key in keys:
+            bisect.insort(self.cells.setdefault(key, []), (order, sprite), key=lambda entry: entry[0])
+        self.entries[sprite] = (order, keys)
+
+    def add(self, sprite) -> None:
+        if sprite not in self.entries:
+            self._insert(sprite, next(self._counter))
+
+    def remove(self, sprite) -> None:
+        entry = self.entries.pop(sprite, None)
+        if entry is None:
+            return
+        order, keys = entry
+        for key in keys:
+            cell = self.cells[key]
+            cell.remove((order, sprite))
+            if not cell:
+                del self.cells[key]
+
+    def move(self, sprite) -> None:
+        """Reindexes a sprite after its rect changed, it keeps its place in the drawing order."""
+        entry = self.entries.get(sprite)
+        if entry is None:
+            return
+        self.remove(sprite)
+        self._insert(sprite, entry[0])
+
+    def rebuild(self) -> None:
+        for sprite, (order, _) in list(self.entries.items()):
+            self.remove(sprite)
+            self._insert(sprite, order)
+
+    def sprites_at(self, pos: (int, int)) -> typing.Iterator:
+        """Sprites colliding with pos, the topmost first."""
+        key = (int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size)
+        for _, sprite in reversed(self.cells.get(key, ())):
+            if sprite.collide(pos):
+                yield sprite
+
+    def __contains__(self, sprite) -> bool:
+        return sprite in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
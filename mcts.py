@@ -0,0 +1,314 @@
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from board import Board, CROSS, ZERO, transform_mask, transform_move
+from movegen import make_move, unmake_move, unique_moves
+from rules import Move, Position
+
+DRAW_REWARD = 0.5
+
+# Event or worker.StopFlag which stops run_search early, set in pool workers
+# by _set_stop_event
+_stop_event = None
+
+
+def _set_stop_event(stop_event) -> None:
+    global _stop_event
+    _stop_event = stop_event
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: Move | None = None, parent: "Node" = None) -> None:
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        # rewards of the player who made move
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> "Node":
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: (
+                child.wins / child.visits
+                + exploration * math.sqrt(log_visits / child.visits)
+            ),
+        )
+
+
+def playout(board: Board, rng: random.Random) -> int | None:
+    """Plays random moves until the game ends, returns the winner or None for a draw."""
+    while True:
+        occupied = board.occupied
+        board.place(rng.choice([i for i in range(36) if not occupied >> i & 1]))
+        if not any(board.conditions()):
+            board.rotate(rng.randrange(4), rng.random() < 0.5)
+
+        cross_won, zero_won, draw = board.conditions()
+        if draw:
+            return None
+        if cross_won:
+            return CROSS
+        if zero_won:
+            return ZERO
+
+
+def _is_winning(board: Board, move: Move) -> bool:
+    player = board.player
+    make_move(board, move)
+    won = board.conditions()[player]
+    unmake_move(board, move)
+    return won
+
+
+def symmetry_between(frame: Position, position: Position) -> int | None:
+    """Symmetry which maps frame onto position, None if they are not equivalent."""
+    for symmetry in range(8):
+        if (
+            transform_mask(frame.cross, symmetry) == position.cross
+            and transform_mask(frame.zero, symmetry) == position.zero
+        ):
+            return symmetry
+    return None
+
+
+def _transformed(move: Move, symmetry: int) -> Move:
+    return Move(*transform_move(*move, symmetry))
+
+
+def grow_tree(
+        root: Node,
+        cross: int,
+        zero: int,
+        deadline: float,
+        exploration: float,
+        rng: random.Random,
+) -> int:
+    """
+    Runs UCT iterations on the tree of the position until deadline or
+    until the stop event is set, returns the number of iterations.
+    """
+    board = Board(cross, zero)
+    player = board.player
+    iterations = 0
+
+    while time.monotonic() < deadline:
+        if _stop_event is not None and _stop_event.is_set():
+            break
+        node = root
+        # selection
+        while node.untried == [] and node.children:
+            node = node.select_child(exploration)
+            make_move(board, node.move)
+
+        # expansion
+        if node.untried is None:
+            node.untried = [] if any(board.conditions()) else unique_moves(board)
+            if node.untried and _is_winning(board, node.untried[0]):
+                # a decisive move makes every other move irrelevant
+                del node.untried[1:]
+            rng.shuffle(node.untried)
+        if node.untried:
+            move = node.untried.pop()
+            make_move(board, move)
+            child = Node(move, node)
+            node.children.append(child)
+            node = child
+
+        # simulation
+        if any(board.conditions()):
+            cross_won, zero_won, draw = board.conditions()
+            winner = None if draw else (CROSS if cross_won else ZERO)
+        else:
+            winner = playout(board, rng)
+        while board.history:
+            board.undo()
+
+        # backpropagation, the move of a node at depth d was made by
+        # the root player for odd d and by the opponent for even d
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        for depth, node in enumerate(reversed(path)):
+            node.visits += 1
+            if depth == 0:
+                continue
+            mover = (player + depth - 1) & 1
+            node.wins += DRAW_REWARD if winner is None else float(winner == mover)
+        iterations += 1
+
+    return iterations
+
+
+def root_stats(root: Node) -> dict:
+    return {child.move: (child.visits, child.wins) for child in root.children}
+
+
+def run_search(
+        cross: int,
+        zero: int,
+        time_limit: float,
+        exploration: float,
+        seed: int | None,
+) -> (dict, int):
+    """
+    UCT search on a new tree until time_limit runs out. Returns visits
+    and wins of every root move and the number of iterations. Module
+    level so it can run in pool workers.
+    """
+    root = Node()
+    iterations = grow_tree(
+        root, cross, zero, time.monotonic() + time_limit, exploration, random.Random(seed)
+    )
+    return root_stats(root), iterations
+
+
+class MCTSEngine:
+    """
+    Monte Carlo tree search with UCT selection and random playouts.
+    With several workers the search runs root-parallel: every pool
+    process grows its own tree for the whole time budget and the visit
+    counts of the root moves are summed up afterwards.
+
+    A single-process engine keeps its tree between calls: search()
+    keeps the subtree of the chosen move, ponder() grows it during the
+    opponent's turn and the next search() continues from the child
+    matching the opponent's actual move. A kept tree also matches
+    positions symmetric to its own, it then keeps growing in its own
+    orientation and its moves are transformed on the way out.
+    """
+
+    def __init__(
+            self,
+            time_limit: float = 1.0,
+            workers: int | None = None,
+            exploration: float = 1.4,
+            seed: int | None = None,
+    ) -> None:
+        self.time_limit = time_limit
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.exploration = exploration
+        self.seed = seed
+        self.iterations = 0
+        self.stats = {}
+        # Event or worker.StopFlag, the search stops once it is set
+        self.stop_event = None
+        self._pool = None
+        self._tree = None
+        self._tree_position = None
+
+    def search(self, position: Position, time_limit: float | None = None) -> Move | None:
+        if position.is_terminal():
+            return None
+        if time_limit is None:
+            time_limit = self.time_limit
+
+        board = position.board()
+        moves = unique_moves(board)
+        if len(moves) == 1 or _is_winning(board, moves[0]):
+            self.stats = {moves[0]: (0, 0.0)}
+            self.iterations = 0
+            self._tree = None
+            return moves[0]
+
+        seed = self.seed if self.seed is not None else random.getrandbits(32)
+        root = None
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(
+                    self.workers, _set_stop_event, (self.stop_event,)
+                )
+            args = [
+                (position.cross, position.zero, time_limit, self.exploration, seed + i)
+                for i in range(self.workers)
+            ]
+            results = self._pool.starmap(run_search, args)
+        else:
+            root, frame, symmetry = self._grow(position, time_limit, seed)
+            stats = {
+                _transformed(move, symmetry): value for move, value in root_stats(root).items()
+            }
+            results = [(stats, self.iterations)]
+
+        self.stats = {}
+        self.iterations = 0
+        for stats, iterations in results:
+            self.iterations += iterations
+            for move, (visits, wins) in stats.items():
+                total_visits, total_wins = self.stats.get(move, (0, 0.0))
+                self.stats[move] = total_visits + visits, total_wins + wins
+
+        if not self.stats:
+            return next(position.legal_moves())
+        move = max(self.stats, key=lambda move: self.stats[move][0])
+        if root is not None:
+            self._tree = next(
+                child for child in root.children if _transformed(child.move, symmetry) == move
+            )
+            self._tree_position = frame.play(self._tree.move)
+        return move
+
+    def ponder(self, position: Position) -> Move | None:
+        """
+        Grows the tree of the opponent's position until stop_event is
+        set, returns the predicted opponent's move. Only a
+        single-process engine has a tree to reuse, others return None.
+        """
+        if self.workers > 1 or position.is_terminal():
+            return None
+        root, frame, symmetry = self._grow(position, math.inf, random.getrandbits(32))
+        self._tree = root
+        self._tree_position = frame
+        if not root.children:
+            return None
+        return _transformed(max(root.children, key=lambda child: child.visits).move, symmetry)
+
+    def _grow(self, position: Position, time_limit: float, seed: int) -> (Node, Position, int):
+        """
+        Grows the tree of position and returns its root, the position
+        the tree is built for and the symmetry mapping that one onto
+        position.
+        """
+        _set_stop_event(self.stop_event)
+        root, frame, symmetry = self._reused_tree(position)
+        self.iterations = grow_tree(
+            root,
+            frame.cross,
+            frame.zero,
+            time.monotonic() + time_limit,
+            self.exploration,
+            random.Random(seed),
+        )
+        return root, frame, symmetry
+
+    def _reused_tree(self, position: Position) -> (Node, Position, int):
+        """
+        Subtree of the kept tree for position or a position symmetric to
+        it, a new tree if there is none. Returns it like _grow().
+        """
+        tree, self._tree = self._tree, None
+        if tree is not None:
+            candidates = [(tree, self._tree_position)] + [
+                (child, self._tree_position.play(child.move)) for child in tree.children
+            ]
+            for root, frame in candidates:
+                symmetry = symmetry_between(frame, position)
+                if symmetry is not None:
+                    root.parent = None
+                    root.move = None
+                    return root, frame, symmetry
+        return Node(), position, 0
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
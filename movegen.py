@@ -0,0 +1,127 @@
+import typing
+
+from board import (
+    Board, CROSS, ZERO, ROTATED_STATES, SYMMETRIES, transform_mask,
+)
+from rules import Move, Position
+
+
+def make_move(board: Board, move: Move) -> None:
+    board.place(move.cell)
+    if move.quadrant is not None:
+        board.rotate(move.quadrant, move.clockwise)
+
+
+def unmake_move(board: Board, move: Move) -> None:
+    if move.quadrant is not None:
+        board.undo()
+    board.undo()
+
+
+def generate_moves(board: Board) -> list:
+    """All moves of Position.legal_moves for board, winning placements first."""
+    moves = Position(*board.masks).legal_moves()
+    return sorted(moves, key=lambda move: move.quadrant is not None)
+
+
+def board_symmetries(board: Board) -> tuple:
+    """Symmetries other than identity which map board onto itself."""
+    hashes = board.hashes
+    return tuple(
+        symmetry for symmetry in range(1, 8)
+        if hashes[symmetry] == hashes[0]
+        and transform_mask(board.masks[CROSS], symmetry) == board.masks[CROSS]
+        and transform_mask(board.masks[ZERO], symmetry) == board.masks[ZERO]
+    )
+
+
+def _placement_cells(board: Board) -> list:
+    """Empty cells with one representative per orbit of board symmetries."""
+    occupied = board.occupied
+    symmetries = board_symmetries(board)
+    return [
+        cell for cell in range(36)
+        if not occupied >> cell & 1
+        and all(SYMMETRIES[symmetry][cell] >= cell for symmetry in symmetries)
+    ]
+
+
+def _distinct_rotations(board: Board) -> list:
+    """
+    Rotations which change the board, with one representative of all
+    no-op rotations (of empty or rotation-invariant quadrants) and
+    without the counterclockwise twin of a half-turn symmetric quadrant.
+    """
+    rotations = []
+    noop = None
+    for quadrant, state in enumerate(board.states):
+        clockwise = ROTATED_STATES[True][state]
+        if clockwise == state:
+            if noop is None:
+                noop = (quadrant, False)
+            continue
+        rotations.append((quadrant, True))
+        if ROTATED_STATES[False][state] != clockwise:
+            rotations.append((quadrant, False))
+    if noop is not None:
+        rotations.append(noop)
+    return rotations
+
+
+def iter_unique_moves(board: Board) -> typing.Iterator[Move]:
+    """
+    Yields moves of the player to place which lead to pairwise different
+    positions up to board symmetry. Every move is made on board while it
+    is yielded and unmade when the iteration continues or the generator
+    is closed. Loops which may stop early have to close it, e.g. with
+    contextlib.closing(), so the board is restored right away and not
+    only when the generator is garbage collected.
+    """
+    seen = set()
+    for cell in _placement_cells(board):
+        board.place(cell)
+        try:
+            if any(board.conditions()):
+                yield Move(cell)
+                continue
+
+            for quadrant, clockwise in _distinct_rotations(board):
+                board.rotate(quadrant, clockwise)
+                try:
+                    key = board.canonical_hash()
+                    if key not in seen:
+                        seen.add(key)
+                        yield Move(cell, quadrant, clockwise)
+                finally:
+                    board.undo()
+        finally:
+            board.undo()
+
+
+def unique_moves(
+        board: Board,
+        score: typing.Callable[[Board, int], int] | None = None,
+) -> list:
+    """
+    Moves of iter_unique_moves as a list. Moves that win right away come
+    first and moves that lose right away come last, the rest are sorted
+    by score(board_after_move, player) when score is given.
+    """
+    player = board.player
+    winning = []
+    scored = []
+    losing = []
+    for move in iter_unique_moves(board):
+        conditions = board.conditions()
+        if conditions[player]:
+            winning.append(move)
+        elif conditions[1 - player]:
+            losing.append(move)
+        elif conditions[2] or score is None:
+            scored.append((0, move))
+        else:
+            scored.append((score(board, player), move))
+
+    if score is not None:
+        scored.sort(key=lambda item: -item[0])
+    return winning + [move for _, move in scored] + losing
@@ -15,6 +15,7 @@ class Pentago:
         )
         pygame.display.set_caption("")
         self.clock = pygame.time.Clock()
+        self.background = None
 
         # creating groups
         self.all_sprites = SpriteGroups(
@@ -22,6 +23,7 @@ class Pentago:
             self.update_theme,
             self.update_scale,
             self.reset_settings,
+            self.update_ai_player,
         )
 
         # sound effects
@@ -37,19 +39,28 @@ class Pentago:
         # )
         # self.win_sound = pygame.mixer.Sound(os.path.join(self.sound_folder, "win.wav"))
 
+        self.reset_background()
+
         # setting up icon
         icon_sprite = SpriteObject("icon")
         pygame.display.set_icon(icon_sprite.image)
 
         self.FPS = 30
+        # seconds without input or changes on screen before the loop
+        # waits for events instead of running at FPS
+        self.IDLE_DELAY = 2
+        # longest wait of an idle loop in milliseconds
+        self.IDLE_TIMEOUT = 1000
+        self.last_activity = pygame.time.get_ticks()
 
     def start(self):
         print(self.all_sprites)
         while True:
-            self.clock.tick(self.FPS)
-            for event in pygame.event.get():
+            events = self.get_events()
+            for event in events:
                 if event.type == pygame.QUIT:
                     data.save()
+                    self.all_sprites.field.worker.shutdown()
                     return 1
 
                 if event.type in (pygame.KEYUP, pygame.MOUSEBUTTONUP):
@@ -58,12 +69,10 @@ class Pentago:
             # update
             self.all_sprites.update()
 
-            # render
-            self.screen.fill(self.background_color)
-            self.all_sprites.draw(self.screen)
-
-            # return to display
-            pygame.display.flip()
+            # render only what changed and return it to display
+            rects = self.all_sprites.draw(self.screen)
+            pygame.display.update(rects)
+            self.track_activity(events, rects)
 
     def run(self):
         start_response = self.start()
@@ -73,8 +82,8 @@ class Pentago:
 
         running = True
         while running:
-            self.clock.tick(self.FPS)
-            for event in pygame.event.get():
+            events = self.get_events()
+            for event in events:
                 self.all_sprites.update(event)
                 # check for closing window
                 if event.type == pygame.QUIT:
@@ -107,13 +116,39 @@ class Pentago:
 
             # update
             self.all_sprites.update()
-
-            # render
-            self.screen.fill(self.background_color)
-            self.all_sprites.draw(self.screen)
-
-            # return to display
-            pygame.display.flip()
+            self.update_caption()
+
+            # render only what changed and return it to display
+            rects = self.all_sprites.draw(self.screen)
+            pygame.display.update(rects)
+            self.track_activity(events, rects)
+
+        self.all_sprites.field.worker.shutdown()
+
+    def get_events(self) -> list:
+        """
+        Events of the next frame. While idle the loop blocks until an
+        event arrives instead of ticking at FPS, input, engine replies
+        (ENGINE_EVENT) and the timeout wake it up.
+        """
+        if pygame.time.get_ticks() - self.last_activity < self.IDLE_DELAY * 1000:
+            self.clock.tick(self.FPS)
+            return pygame.event.get()
+        event = pygame.event.wait(self.IDLE_TIMEOUT)
+        self.clock.tick()
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def track_activity(self, events: list, rects: list) -> None:
+        # anything redrawn, like an animation, keeps the loop awake
+        if events or rects:
+            self.last_activity = pygame.time.get_ticks()
+
+    def update_caption(self) -> None:
+        caption = "thinking..." if self.all_sprites.field.worker.thinking else ""
+        if caption != pygame.display.get_caption()[0]:
+            pygame.display.set_caption(caption)
 
     def update_scale(self, new_scale: int) -> None:
         if new_scale == data.settings.scale:
@@ -121,19 +156,22 @@ class Pentago:
 
         old_scale = data.settings.scale
         data.settings.scale = new_scale
-        data.assets.update_assets()
-        pygame.display.set_mode((data.settings.width, data.settings.height))
+        self.screen = pygame.display.set_mode((data.settings.width, data.settings.height))
 
         self.all_sprites.update_scale(old_scale, new_scale)
+        self.reset_background()
 
     def update_theme(self, new_theme: str) -> None:
         if new_theme == data.settings.theme:
             return
 
         data.settings.theme = new_theme
-        data.assets.update_assets()
 
         self.all_sprites.update_theme()
+        self.reset_background()
+
+    def update_ai_player(self, ai_player: int | None) -> None:
+        data.settings.ai_player = ai_player
 
     def reset_settings(self):
         old_scale = data.settings.scale
@@ -141,11 +179,22 @@ class Pentago:
         data.settings.back_to_default()
 
         if old_theme != data.settings.theme or old_scale != data.settings.scale:
-            data.assets.update_assets()
             if old_scale != data.settings.scale:
                 self.all_sprites.update_scale(old_scale, data.settings.scale)
             else:
                 self.all_sprites.update_theme()
+            self.reset_background()
+
+    def reset_background(self) -> None:
+        """
+        SpriteGroups draws only the areas of changed sprites over this
+        background, so after a theme or size change the whole screen is
+        repainted once.
+        """
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.background.fill(self.background_color)
+        self.all_sprites.clear(self.screen, self.background)
+        self.all_sprites.repaint_rect(self.screen.get_rect())
 
     @property
     def background_color(self):
@@ -0,0 +1,108 @@
+import mmap
+import os
+import typing
+
+from rules import Move
+
+# start of every record file, the last byte is the format version
+MAGIC = b"PTG\x01"
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    """7 bits per byte, the high bit marks that more bytes follow."""
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, offset: int) -> (int, int):
+    """Value and offset of the next byte, ValueError if data ends inside the varint."""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("data ends inside a varint")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_game(moves: typing.Iterable[Move], result: int) -> bytes:
+    """
+    Result byte followed by the moves, Move.code is below 324 and takes
+    one byte for cells of the top left quadrant and part of the top
+    right one, two bytes for all others.
+    """
+    buffer = bytearray([result])
+    for move in moves:
+        _write_varint(buffer, move.code)
+    return bytes(buffer)
+
+
+def decode_game(payload) -> (list, int):
+    """Moves and result of encode_game's bytes."""
+    moves = []
+    offset = 1
+    while offset < len(payload):
+        code, offset = _read_varint(payload, offset)
+        moves.append(Move.from_code(code))
+    return moves, payload[0]
+
+
+class GameWriter:
+    """
+    Appends games to a record file, every game is its varint length
+    followed by encode_game's bytes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def write(self, moves: typing.Iterable[Move], result: int) -> None:
+        payload = encode_game(moves, result)
+        buffer = bytearray()
+        _write_varint(buffer, len(payload))
+        self.file.write(buffer + payload)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "GameWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def append_game(path: str, moves: typing.Iterable[Move], result: int) -> None:
+    with GameWriter(path) as writer:
+        writer.write(moves, result)
+
+
+def read_games(path: str) -> typing.Iterator[tuple]:
+    """
+    Yields (moves, result) of every game in a record file. The file is
+    memory-mapped, so it is read as the iteration goes and never held
+    in memory as a whole.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as record_file, mmap.mmap(
+            record_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        offset = len(MAGIC)
+        size = len(data)
+        while offset < size:
+            length, offset = _read_varint(data, offset)
+            if offset + length > size:
+                raise ValueError(f"{path} ends inside a game")
+            yield decode_game(data[offset:offset + length])
+            offset += length
@@ -0,0 +1,322 @@
+import dataclasses
+import json
+import typing
+
+from board import (
+    Board, CROSS, ZERO, CELL_LINE_COUNTS, FULL_MASK, QUADRANT_MASK, ROTATED,
+    has_five, index_from_row_col, packed_lines, row_col_from_index,
+)
+
+# results, CROSS and ZERO stand for the winner
+DRAW = 2
+
+# steps of a turn, the values are the ones Field.current_step always used
+PLACE = 0
+ROTATE = 1
+PLACE_OR_ROTATE = -1
+
+SIGNS = {CROSS: "x", ZERO: "o", None: "."}
+
+
+class Move(typing.NamedTuple):
+    """
+    Placement on cell followed by rotation of quadrant. quadrant is None
+    when the turn ends without a rotation: the placement finished the
+    game or the player skipped rotating because some quadrant is empty.
+    """
+
+    cell: int
+    quadrant: int | None = None
+    clockwise: bool = False
+
+    def __str__(self) -> str:
+        row, col = row_col_from_index(self.cell)
+        if self.quadrant is None:
+            return f"{row}{col}"
+        return f"{row}{col}{self.quadrant}{'r' if self.clockwise else 'l'}"
+
+    @property
+    def code(self) -> int:
+        """Number below 324 which identifies the move."""
+        if self.quadrant is None:
+            return self.cell * 9 + 8
+        return self.cell * 9 + self.quadrant * 2 + self.clockwise
+
+    @classmethod
+    def from_code(cls, code: int) -> "Move":
+        cell, rotation = divmod(code, 9)
+        if rotation == 8:
+            return cls(cell)
+        return cls(cell, rotation >> 1, bool(rotation & 1))
+
+    @classmethod
+    def from_string(cls, string: str) -> "Move":
+        cell = index_from_row_col(int(string[0]), int(string[1]))
+        if len(string) == 2:
+            return cls(cell)
+        return cls(cell, int(string[2]), string[3] == "r")
+
+
+def rotate_mask(mask: int, quadrant: int, clockwise: bool) -> int:
+    shift = quadrant * 9
+    pattern = mask >> shift & QUADRANT_MASK
+    return mask ^ (pattern ^ ROTATED[clockwise][pattern]) << shift
+
+
+def has_empty_quadrant(occupied: int) -> bool:
+    return not all(occupied >> quadrant * 9 & QUADRANT_MASK for quadrant in range(4))
+
+
+@dataclasses.dataclass(frozen=True)
+class Position:
+    """Immutable position with cross and zero stones as board masks."""
+
+    cross: int = 0
+    zero: int = 0
+
+    @property
+    def occupied(self) -> int:
+        return self.cross | self.zero
+
+    @property
+    def player(self) -> int:
+        return self.occupied.bit_count() & 1
+
+    @property
+    def empty_cells(self) -> int:
+        return 36 - self.occupied.bit_count()
+
+    def result(self) -> int | None:
+        """CROSS or ZERO for the winner, DRAW or None if the game goes on."""
+        lines = packed_lines(self.cross, self.zero)
+        cross_won = has_five(lines, CROSS)
+        zero_won = has_five(lines, ZERO)
+        if cross_won and zero_won:
+            return DRAW
+        if cross_won:
+            return CROSS
+        if zero_won:
+            return ZERO
+        if self.occupied == FULL_MASK:
+            return DRAW
+        return None
+
+    def is_terminal(self) -> bool:
+        return self.result() is not None
+
+    def legal_moves(self) -> typing.Iterator[Move]:
+        if self.is_terminal():
+            return
+        occupied = self.occupied
+        player = self.player
+        lines = packed_lines(self.cross, self.zero)
+        for cell in range(36):
+            bit = 1 << cell
+            if occupied & bit:
+                continue
+            if has_five(lines + CELL_LINE_COUNTS[player][cell], player) or occupied | bit == FULL_MASK:
+                yield Move(cell)
+                continue
+            for quadrant in range(4):
+                yield Move(cell, quadrant, False)
+                yield Move(cell, quadrant, True)
+
+    def play(self, move: Move) -> "Position":
+        bit = 1 << move.cell
+        if self.occupied & bit:
+            raise ValueError(f"cell {move.cell} is already occupied")
+        if self.is_terminal():
+            raise ValueError("game is already over")
+
+        cross, zero = self.cross, self.zero
+        if self.player == CROSS:
+            cross |= bit
+        else:
+            zero |= bit
+
+        position = Position(cross, zero)
+        if move.quadrant is None:
+            if not position.is_terminal() and not has_empty_quadrant(position.occupied):
+                raise ValueError("rotation can only be skipped with an empty quadrant")
+            return position
+        if position.is_terminal():
+            return position
+        return Position(
+            rotate_mask(cross, move.quadrant, move.clockwise),
+            rotate_mask(zero, move.quadrant, move.clockwise),
+        )
+
+    def board(self) -> Board:
+        return Board(self.cross, self.zero)
+
+    def to_string(self) -> str:
+        """36 characters row by row, 'x' for cross, 'o' for zero, '.' for empty."""
+        board = self.board()
+        return "".join(
+            SIGNS[board.get(index_from_row_col(row, col))]
+            for row in range(6) for col in range(6)
+        )
+
+    @classmethod
+    def from_string(cls, string: str) -> "Position":
+        if len(string) != 36:
+            raise ValueError(f"invalid position string: {string!r}")
+        masks = [0, 0]
+        for i, sign in enumerate(string):
+            index = index_from_row_col(*divmod(i, 6))
+            if sign == SIGNS[CROSS]:
+                masks[CROSS] |= 1 << index
+            elif sign == SIGNS[ZERO]:
+                masks[ZERO] |= 1 << index
+            elif sign != SIGNS[None]:
+                raise ValueError(f"invalid sign: {sign!r}")
+        return cls(*masks)
+
+    def __str__(self) -> str:
+        string = self.to_string()
+        return "\n".join(string[row * 6:row * 6 + 6] for row in range(6))
+
+
+class Game:
+    """
+    Game in progress, played step by step the way Field does it:
+    place, then rotate or, while some quadrant is empty, let the
+    next player place right away.
+    """
+
+    def __init__(self) -> None:
+        self.board = Board()
+        self.step = PLACE
+        self.moves = []
+        self._placed = None
+        # Board.history entries of undone steps, the last one is redone first
+        self._redo = []
+
+    @property
+    def position(self) -> Position:
+        return Position(*self.board.masks)
+
+    @property
+    def player(self) -> int:
+        return self.board.player
+
+    def conditions(self) -> (bool, bool, bool):
+        return self.board.conditions()
+
+    def is_over(self) -> bool:
+        return any(self.board.conditions())
+
+    def result(self) -> int | None:
+        cross_won, zero_won, draw = self.board.conditions()
+        if cross_won:
+            return CROSS
+        if zero_won:
+            return ZERO
+        if draw:
+            return DRAW
+        return None
+
+    def can_place(self) -> bool:
+        return self.step in (PLACE, PLACE_OR_ROTATE) and not self.is_over()
+
+    def can_rotate(self) -> bool:
+        return self.step in (ROTATE, PLACE_OR_ROTATE) and not self.is_over()
+
+    def place(self, cell: int) -> None:
+        if not self.can_place():
+            raise ValueError("placing is not allowed now")
+        self._redo.clear()
+        self._place(cell)
+
+    def _place(self, cell: int) -> None:
+        if self._placed is not None:
+            self.moves.append(Move(self._placed))
+        self.board.place(cell)
+        self._placed = cell
+
+        if self.is_over():
+            self.moves.append(Move(cell))
+            self._placed = None
+        elif has_empty_quadrant(self.board.occupied):
+            self.step = PLACE_OR_ROTATE
+        else:
+            self.step = ROTATE
+
+    def rotate(self, quadrant: int, clockwise: bool) -> None:
+        if not self.can_rotate():
+            raise ValueError("rotating is not allowed now")
+        self._redo.clear()
+        self._rotate(quadrant, clockwise)
+
+    def _rotate(self, quadrant: int, clockwise: bool) -> None:
+        self.board.rotate(quadrant, clockwise)
+        self.moves.append(Move(self._placed, quadrant, clockwise))
+        self._placed = None
+        self.step = PLACE
+
+    def can_undo(self) -> bool:
+        return bool(self.board.history)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> int:
+        """
+        Takes back the last placement or rotation and returns its
+        Board.history entry. Only the board and the ends of the move
+        lists change, nothing is replayed.
+        """
+        if not self.board.history:
+            raise ValueError("there is nothing to undo")
+        entry = self.board.history[-1]
+        self.board.undo()
+        if entry >= 36:
+            self._placed = self.moves.pop().cell
+            self.step = PLACE_OR_ROTATE if has_empty_quadrant(self.board.occupied) else ROTATE
+        else:
+            if self._placed is None:
+                # the placement ended the game
+                self.moves.pop()
+            self._placed = None
+            history = self.board.history
+            if history and history[-1] < 36:
+                # the placement before skipped its rotation
+                self._placed = self.moves.pop().cell
+                self.step = PLACE_OR_ROTATE
+            else:
+                self.step = PLACE
+        self._redo.append(entry)
+        return entry
+
+    def redo(self) -> int:
+        """Plays the last undone step again and returns its Board.history entry."""
+        if not self._redo:
+            raise ValueError("there is nothing to redo")
+        entry = self._redo.pop()
+        if entry < 36:
+            self._place(entry)
+        else:
+            quadrant, clockwise = divmod(entry - 36, 2)
+            self._rotate(quadrant, bool(clockwise))
+        return entry
+
+    def apply(self, move: Move) -> None:
+        self.place(move.cell)
+        if move.quadrant is not None and not self.is_over():
+            self.rotate(move.quadrant, move.clockwise)
+
+    def legal_moves(self) -> typing.Iterator[Move]:
+        return self.position.legal_moves()
+
+    def dumps(self) -> str:
+        moves = self.moves.copy()
+        if self._placed is not None:
+            moves.append(Move(self._placed))
+        return json.dumps({"moves": [str(move) for move in moves]})
+
+    @classmethod
+    def loads(cls, string: str) -> "Game":
+        game = cls()
+        for move in json.loads(string)["moves"]:
+            game.apply(Move.from_string(move))
+        return game
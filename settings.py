@@ -12,10 +12,14 @@ class Settings:
     scale: int
     theme: str
     sound_state: int
+    ai_player: int | None
+    ai_time_limit: float
     data_folder: str
     base_img_folder: str
     img_folder: str
     db_filename: str
+    tablebase_folder: str
+    records_filename: str
 
     @property
     def width(self):
@@ -37,6 +41,18 @@ class Settings:
     def data_path(self):
         return os.path.join(os.path.dirname(__name__), self.data_folder)
 
+    @property
+    def db_path(self):
+        return os.path.join(self.data_folder, self.db_filename)
+
+    @property
+    def tablebase_path(self):
+        return os.path.join(self.data_folder, self.tablebase_folder)
+
+    @property
+    def records_path(self):
+        return os.path.join(self.data_path, self.records_filename)
+
     @property
     def base_img_path(self):
         return os.path.join(self.data_path, self.base_img_folder)
@@ -45,6 +61,11 @@ class Settings:
     def img_path(self):
         return os.path.join(self.data_path, self.img_folder)
 
+    @property
+    def variant_img_path(self):
+        # generated images differ by theme and scale, every variant has its own folder
+        return os.path.join(self.img_path, f"{self.theme}_{self.scale}")
+
     @property
     def field_center(self) -> (int, int):
         return self.width // 2, self.width // 2 + 80 * self.scale
@@ -75,6 +96,7 @@ class Settings:
                     "scale": self.scale,
                     "theme": self.theme,
                     "sound_state": self.sound_state,
+                    "ai_player": self.ai_player,
                 },
                 settings_file
             )
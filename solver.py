@@ -0,0 +1,156 @@
+import sys
+import time
+import typing
+
+from board import Board
+from evaluation import evaluate
+from movegen import make_move, unmake_move, unique_moves
+from rules import Move, Position
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# game values for the player to move
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+class SolverStopped(Exception):
+    pass
+
+
+class Solution(typing.NamedTuple):
+    value: int
+    move: Move | None
+    nodes: int
+    seconds: float
+    # distinct positions, up to symmetry, searched by this solve() call,
+    # positions answered by the table from earlier calls do not count
+    proof_size: int
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class EndgameSolver:
+    """
+    Exact win/draw/loss solver for positions with at most max_empty
+    empty cells. Alpha-beta over the three game values, symmetry-reduced
+    moves with immediate wins first and a transposition table keyed by
+    the canonical position. score orders the other moves as in
+    unique_moves.
+    """
+
+    def __init__(
+            self,
+            max_empty: int = 6,
+            table_bits: int = 20,
+            score: typing.Callable[[Board, int], int] | None = None,
+    ) -> None:
+        self.max_empty = max_empty
+        self.score = score
+        self.table = TranspositionTable(table_bits)
+        self.nodes = 0
+        # Event or worker.StopFlag, the solver stops once it is set
+        self.stop_event = None
+        self._deadline = None
+        # canonical hashes of the positions searched by the current solve()
+        self._solved = set()
+
+    def can_solve(self, position: Position) -> bool:
+        return not position.is_terminal() and position.empty_cells <= self.max_empty
+
+    def solve(self, position: Position, time_limit: float | None = None) -> Solution:
+        """Raises SolverStopped if time_limit runs out or stop_event is set."""
+        if position.is_terminal():
+            raise ValueError("game is already over")
+        if position.empty_cells > self.max_empty:
+            raise ValueError(
+                f"{position.empty_cells} empty cells, the solver is limited to {self.max_empty}"
+            )
+        start = time.monotonic()
+        self._deadline = None if time_limit is None else start + time_limit
+        self.nodes = 0
+        self._solved.clear()
+        self.table.new_search()
+
+        value, move = self._solve(position.board(), LOSS, WIN)
+        return Solution(
+            value, move, self.nodes, time.monotonic() - start, len(self._solved),
+        )
+
+    def _solve(self, board: Board, alpha: int, beta: int) -> (int, Move | None):
+        if (self._deadline is not None and time.monotonic() > self._deadline) or (
+            self.stop_event is not None and self.stop_event.is_set()
+        ):
+            raise SolverStopped
+
+        original_alpha = alpha
+        table_move = None
+        entry = self.table.probe(board)
+        if entry is not None:
+            _, bound, value, table_move = entry
+            if bound == EXACT:
+                return value, table_move
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, table_move
+
+        player = board.player
+        empty = 36 - board.stones
+        moves = unique_moves(board, self.score if empty > 3 else None)
+        if table_move is not None and table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+
+        best = LOSS - 1
+        best_move = None
+        for move in moves:
+            self.nodes += 1
+            make_move(board, move)
+            conditions = board.conditions()
+            if conditions[player]:
+                value = WIN
+            elif conditions[1 - player]:
+                value = LOSS
+            elif conditions[2]:
+                value = DRAW
+            else:
+                value = -self._solve(board, -beta, -alpha)[0]
+            unmake_move(board, move)
+
+            if value > best:
+                best = value
+                best_move = move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        self._solved.add(board.canonical_hash())
+        if best <= original_alpha:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(board, empty, bound, best, best_move)
+        return best, best_move
+
+
+if __name__ == "__main__":
+    # python solver.py <36 characters of x, o and .> [max_empty]
+    position = Position.from_string(sys.argv[1])
+    solver = EndgameSolver(
+        int(sys.argv[2]) if len(sys.argv) > 2 else position.empty_cells, score=evaluate,
+    )
+    solution = solver.solve(position)
+    print(position)
+    print(f"value: {('loss', 'draw', 'win')[solution.value + 1]}")
+    print(f"move: {solution.move}")
+    print(f"nodes: {solution.nodes}, {solution.nodes_per_second:.0f} nodes/s")
+    print(f"proof size: {solution.proof_size} positions")
+    print(f"time: {solution.seconds:.2f} s")
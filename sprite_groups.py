@@ -1,4 +1,5 @@
 import datetime
+import functools
 import json
 import time
 import typing
@@ -7,6 +8,15 @@ import pygame
 
 from sprites import *
 from data import data
+from ai import AlphaBetaEngine
+from worker import EngineWorker
+from board import CROSS, ZERO, cell_index
+from rules import Game, Move, PLACE, ROTATE, PLACE_OR_ROTATE
+from records import append_game
+from hit_grid import HitGrid
+
+# posted when an engine search finishes, wakes up an idle game loop
+ENGINE_EVENT = pygame.event.custom_type()
 
 
 class Panel:
@@ -29,8 +39,10 @@ class Panel:
         if active == self.active:
             return
         self._active = active
-        self.sprite_groups.remove(self.sprite_group)
-        self.sprite_group = self.sprite_groups_by_activity[self.active]
+        old, self.sprite_group = self.sprite_group, self.sprite_groups_by_activity[self.active]
+        # sprites shown in both states stay where they are
+        self.sprite_groups.remove(*[sprite for sprite in old if sprite not in self.sprite_group])
+        self.sprite_groups.add(*[sprite for sprite in self.sprite_group if sprite not in old])
 
     def add_sprite(self, *args, active_state: bool = None):
         for sprite in args:
@@ -39,6 +51,8 @@ class Panel:
 
             if active_state in (False, None):
                 self.sprite_groups_by_activity[False].add(sprite)
+        if active_state in (self.active, None):
+            self.sprite_groups.add(*args)
 
     @property
     def sprites(self):
@@ -52,11 +66,22 @@ class Field:
         self.sprite_groups = sprite_groups
         self.sprite_group = pygame.sprite.Group()
         self._active = False
-        self._current_step = 0
-        self.current_sign = 0
+        self.game = Game()
+        self.worker = EngineWorker(
+            functools.partial(
+                AlphaBetaEngine,
+                data.settings.ai_time_limit,
+                book_path=data.settings.db_path,
+                tablebase_path=data.settings.tablebase_path,
+            ),
+            on_done=lambda: pygame.event.post(pygame.event.Event(ENGINE_EVENT)),
+        )
         self.cross_won = False
         self.zero_won = False
         self.draw = False
+        self.winning_lines = ()
+        # move lists of the endings of this game already recorded and scored
+        self.recorded = set()
         self.center = data.settings.field_center
         subfield_center_dist = data.settings.subfield_center_distance
         self.subfield_cords = (
@@ -138,6 +163,14 @@ class Field:
         sprites.add(self.text_sprites)
         return sprites
 
+    def show(self, *sprites) -> None:
+        self.sprite_group.add(*sprites)
+        self.sprite_groups.add(*sprites)
+
+    def hide(self, *sprites) -> None:
+        self.sprite_group.remove(*sprites)
+        self.sprite_groups.remove(*sprites)
+
     def save_score(self):
         with open("score.json", "w") as file:
             json.dump(self.score_values, file)
@@ -198,40 +231,39 @@ class Field:
             return
         self._active = active
         if not self.active:
+            self.worker.cancel()
             self.set_subfields_active(False)
             self.set_arrows_active(False)
         else:
             self.update()
 
     @property
-    def current_step(self):
-        return self._current_step
+    def board(self):
+        return self.game.board
 
-    @current_step.setter
-    def current_step(self, current_step: int):
-        if current_step not in (-1, 0, 1):
-            raise ValueError(f"invalid current_step: {current_step}")
-        self._current_step = current_step
-        self.update()
-
-    def unite(self):
-        res = [None] * 6
-        for i in range(3):
-            res[i] = self.field[0][i] + self.field[1][i]
-            res[3 + i] = self.field[2][i] + self.field[3][i]
-        return res
+    @property
+    def current_sign(self):
+        return int(self.board.player == CROSS)
 
-    def is_any_empty_subfields(self):
-        return any([subfield.is_empty() for subfield in self.field])
+    @property
+    def current_step(self):
+        return self.game.step
 
     def update(self):
         self.set_subfields_active(False)
         self.set_arrows_active(False)
 
-        if self.current_step in (-1, 0):
+        # the player who just placed rotates, the other one places next
+        if (
+            self.current_step in (PLACE_OR_ROTATE, PLACE)
+            and self.board.player != data.settings.ai_player
+        ):
             self.set_subfields_active(True)
 
-        if self.current_step in (-1, 1):
+        # the AI places and rotates at once, so a pending rotation always
+        # follows a human placement and stays with the human, even if
+        # ai_player was switched to that side meanwhile
+        if self.current_step in (PLACE_OR_ROTATE, ROTATE):
             self.set_arrows_active(True)
 
         self.win_draw_check()
@@ -248,118 +280,136 @@ class Field:
             subfield.set_arrows_active(active)
 
     def win_draw_check(self):
-        type_field = list(map(lambda x: [type(i) for i in x], self.unite()))
         old = self.get_conditions()
-
-        for i in range(6):
-            # horizontal
-            if [type_field[i][j] for j in range(5)].count(Cross) == 5 or [
-                type_field[i][j] for j in range(1, 6)
-            ].count(Cross) == 5:
-                self.cross_won = True
-            if [type_field[i][j] for j in range(5)].count(Zero) == 5 or [
-                type_field[i][j] for j in range(1, 6)
-            ].count(Zero) == 5:
-                self.zero_won = True
-
-            # vertical
-            if [type_field[j][i] for j in range(5)].count(Cross) == 5 or [
-                type_field[j][i] for j in range(1, 6)
-            ].count(Cross) == 5:
-                self.cross_won = True
-            if [type_field[j][i] for j in range(5)].count(Zero) == 5 or [
-                type_field[j][i] for j in range(1, 6)
-            ].count(Zero) == 5:
-                self.zero_won = True
-
-        # main diagonals
-        if any(
-                (
-                        [type_field[i][i + 1] for i in range(5)].count(Cross) == 5,
-                        [type_field[i][i] for i in range(5)].count(Cross) == 5,
-                        [type_field[i][i] for i in range(1, 6)].count(Cross) == 5,
-                        [type_field[i + 1][i] for i in range(5)].count(Cross) == 5,
-                )
-        ):
-            self.cross_won = True
-
-        if any(
-                (
-                        [type_field[i][i + 1] for i in range(5)].count(Zero) == 5,
-                        [type_field[i][i] for i in range(5)].count(Zero) == 5,
-                        [type_field[i][i] for i in range(1, 6)].count(Zero) == 5,
-                        [type_field[i + 1][i] for i in range(5)].count(Zero) == 5,
-                )
-        ):
-            self.zero_won = True
-
-        # side diagonals
-        if any(
-                (
-                        [type_field[5 - i][i + 1] for i in range(5)].count(Cross) == 5,
-                        [type_field[5 - i][i] for i in range(5)].count(Cross) == 5,
-                        [type_field[5 - i][i] for i in range(1, 6)].count(Cross) == 5,
-                        [type_field[4 - i][i] for i in range(5)].count(Cross) == 5,
-                )
-        ):
-            self.zero_won = True
-
-        if any(
-                (
-                        [type_field[5 - i][i + 1] for i in range(5)].count(Zero) == 5,
-                        [type_field[5 - i][i] for i in range(5)].count(Zero) == 5,
-                        [type_field[5 - i][i] for i in range(1, 6)].count(Zero) == 5,
-                        [type_field[4 - i][i] for i in range(5)].count(Zero) == 5,
-                )
-        ):
-            self.zero_won = True
-
-        # draw check
-        if all(all(i is not Cell for i in row) for row in type_field):
-            self.draw = True
-
-        if self.cross_won and self.zero_won:
-            self.cross_won, self.zero_won = False, False
-            self.draw = True
+        self.cross_won, self.zero_won, self.draw = self.board.conditions()
+        self.winning_lines = (
+            self.board.winning_lines(CROSS) + self.board.winning_lines(ZERO)
+        )
 
         new = self.get_conditions()
         if old == new:
             return
 
-        if any(self.get_conditions()):
-            self.sprite_group.add(self.restart_sprite)
-            # TODO
-            # self.game.win_sound.play()
+        self.hide(self.text_sprites)
+        if not any(new):
+            return
+
+        self.show(self.restart_sprite)
+        # TODO
+        # self.game.win_sound.play()
+        if self.cross_won:
+            self.show(self.cross_won_sprite)
+        elif self.zero_won:
+            self.show(self.zero_won_sprite)
+        else:
+            self.show(self.draw_sprite)
+
+        # an ending reached again after undo and redo is counted once,
+        # a different ending after undo counts as a game of its own
+        moves = tuple(self.game.moves)
+        if moves not in self.recorded:
+            self.recorded.add(moves)
+            append_game(data.settings.records_path, self.game.moves, self.game.result())
             if self.cross_won:
-                self.sprite_group.add(self.cross_won_sprite)
                 data.score["cross"] += 1
             elif self.zero_won:
-                self.sprite_group.add(self.zero_won_sprite)
                 data.score["zero"] += 1
             else:
-                self.sprite_group.add(self.draw_sprite)
                 data.score["draw"] += 1
 
     def restart(self):
-        self.sprite_group.remove(self.text_sprites)
+        self.hide(self.text_sprites)
+        self.worker.cancel()
+        self.game = Game()
         for subfield in self.field:
             subfield.restart()
         self.cross_won = False
         self.zero_won = False
         self.draw = False
-        self.current_sign = 1
-        self.current_step = 0
+        self.winning_lines = ()
+        self.recorded.clear()
         self.active = True
         self.update()
 
+    def undo(self) -> None:
+        """
+        Takes back steps until a human is to place, so with an AI player
+        its reply is taken back too. Only the sprites of cells the steps
+        changed are touched.
+        """
+        self.step_history(self.game.undo, self.game.can_undo)
+
+    def redo(self) -> None:
+        self.step_history(self.game.redo, self.game.can_redo)
+
+    def step_history(self, step: typing.Callable, can_step: typing.Callable) -> None:
+        if not can_step():
+            return
+        self.worker.cancel()
+        while True:
+            entry = step()
+            self.field[entry // 9 if entry < 36 else (entry - 36) // 2].sync()
+            if not can_step() or self.is_human_step():
+                break
+        if self.active:
+            self.update()
+        else:
+            # the game was over before
+            self.active = True
+
     def get_conditions(self):
         return self.cross_won, self.zero_won, self.draw
 
+    def is_ai_turn(self) -> bool:
+        return (
+            self.active
+            and data.settings.ai_player is not None
+            and self.current_step == PLACE
+            and self.board.player == data.settings.ai_player
+            and not self.game.is_over()
+        )
+
+    def is_human_turn(self) -> bool:
+        return (
+            self.active
+            and data.settings.ai_player is not None
+            and self.current_step == PLACE
+            and self.board.player != data.settings.ai_player
+            and not self.game.is_over()
+        )
+
+    def is_human_step(self) -> bool:
+        return (
+            data.settings.ai_player is None
+            or self.game.is_over()
+            or self.current_step == PLACE and self.board.player != data.settings.ai_player
+        )
+
+    def update_ai(self) -> None:
+        if self.worker.thinking:
+            position = self.worker.position
+            move = self.worker.poll()
+            if move is not None and position == self.game.position:
+                self.make_move(move)
+        elif self.is_ai_turn():
+            self.worker.start(self.game.position)
+        elif self.is_human_turn() and not self.worker.pondering:
+            # search the human's position meanwhile, the next search
+            # reuses what the engine learned
+            self.worker.ponder(self.game.position)
+
+    def make_move(self, move: Move) -> None:
+        local = move.cell % 9
+        self.field[move.cell // 9].add_sign(local % 3, local // 3)
+        if move.quadrant is not None and self.game.can_rotate():
+            self.field[move.quadrant].rotate(move.clockwise)
+
 
 class SubField:
     def __init__(self, num: int, field: Field):
         super().__init__()
         self.field = field
+        self.num = num
         self.active = False
         self.cords = field.subfield_cords[num]
         self.subfield_sprite = CordSpriteObject("subfield", self.cords)
@@ -378,50 +428,78 @@ class SubField:
             self.rotate_clockwise,
         )
         self.set_arrows_active(False)
-        self.field.sprite_group.add(
+        self.field.show(
             self.subfield_sprite,
             self.clockwise_arrow,
             self.counterclockwise_arrow
         )
-        self.field.sprite_group.add(*self.field_list)
+        self.field.show(*self.field_list)
 
     def add_sign(self, x: int, y: int) -> None:
-        if not isinstance(self.field_list[y][x], Cell):
+        index = cell_index(self.num, x, y)
+        if not self.field.board.is_empty(index):
             return
 
-        self.field_list[y][x].kill()
-        if self.field.current_sign == 1:
-            self.field_list[y][x] = Cross(self, x, y)
-            self.field.current_sign = 0
-        else:
-            self.field_list[y][x] = Zero(self, x, y)
-            self.field.current_sign = 1
-        self.field.sprite_group.add(self.field_list[y][x])
-
-        if self.field.is_any_empty_subfields():
-            self.field.current_step = -1
-        else:
-            self.field.current_step = 1
+        self.field.game.place(index)
+        self.relayout(1 << y * 3 + x)
+        self.field.update()
 
     def rotate_counterclockwise(self) -> None:
-        new_field_list = [[None] * 3, [None] * 3, [None] * 3]
-        for y in range(3):
-            for x in range(3):
-                new_field_list[y][x] = self.field_list[x][2 - y]
-                new_field_list[y][x].change_pos(x, y)
-
-        self.field_list = new_field_list
-        self.field.current_step = 0
+        self.rotate(False)
 
     def rotate_clockwise(self) -> None:
-        new_field_list = [[None] * 3, [None] * 3, [None] * 3]
-        for y in range(3):
-            for x in range(3):
-                new_field_list[y][x] = self.field_list[2 - x][y]
-                new_field_list[y][x].change_pos(x, y)
-
-        self.field_list = new_field_list
-        self.field.current_step = 0
+        self.rotate(True)
+
+    def rotate(self, clockwise: bool) -> None:
+        board = self.field.board
+        old_patterns = board.quadrant(self.num, CROSS), board.quadrant(self.num, ZERO)
+        self.field.game.rotate(self.num, clockwise)
+        new_patterns = board.quadrant(self.num, CROSS), board.quadrant(self.num, ZERO)
+        self.relayout(
+            (old_patterns[0] ^ new_patterns[0]) | (old_patterns[1] ^ new_patterns[1])
+        )
+        self.field.update()
+
+    def relayout(self, changed: int) -> None:
+        """
+        Rearranges sprites of the cells in the changed 9-bit pattern.
+        Sprites with the same content are interchangeable, so the ones
+        freed from changed cells are moved to changed cells that need
+        that content and all other sprites stay untouched. New sprites
+        are only made when a cell got a content none of the freed
+        sprites has, like after placing or taking a sign back.
+        """
+        cells = [(local % 3, local // 3) for local in range(9) if changed >> local & 1]
+        free = {Cell: [], Cross: [], Zero: []}
+        for x, y in cells:
+            free[type(self.field_list[y][x])].append(self.field_list[y][x])
+
+        for x, y in cells:
+            sprite_type = self.sprite_type(x, y)
+            if free[sprite_type]:
+                self.field_list[y][x] = free[sprite_type].pop()
+                self.field_list[y][x].change_pos(x, y)
+            else:
+                self.field_list[y][x] = sprite_type(self, x, y)
+                self.field.show(self.field_list[y][x])
+
+        for sprites in free.values():
+            for sprite in sprites:
+                sprite.kill()
+
+    def sprite_type(self, x: int, y: int) -> type:
+        sign = self.field.board.get(cell_index(self.num, x, y))
+        return Cell if sign is None else (Cross, Zero)[sign]
+
+    def sync(self) -> None:
+        """Relayouts the cells whose sprites no longer show the board, e.g. after an undo."""
+        changed = 0
+        for local in range(9):
+            x, y = local % 3, local // 3
+            if type(self.field_list[y][x]) is not self.sprite_type(x, y):
+                changed |= 1 << local
+        if changed:
+            self.relayout(changed)
 
     def restart(self) -> None:
         for row in self.field_list:
@@ -430,13 +508,13 @@ class SubField:
         self.field_list = [
             [Cell(self, i, j) for i in range(3)] for j in range(3)
         ]
-        self.field.sprite_group.add(*self.field_list)
+        self.field.show(*self.field_list)
 
     def hovered(self) -> None:
         pass
 
     def is_empty(self) -> bool:
-        return all([all([type(i) is Cell for i in row]) for row in self])
+        return self.field.board.is_quadrant_empty(self.num)
 
     def set_active(self, active: bool) -> None:
         print(f"changing {str(self)}.active from {self.active} to {active}")
@@ -450,7 +528,7 @@ class SubField:
         self.clockwise_arrow.set_active(active)
 
     def __str__(self) -> str:
-        return f"SubField {self.field.field.index(self)}"
+        return f"SubField {self.num}"
 
     def __getitem__(self, key):
         return self.field_list[key]
@@ -464,7 +542,8 @@ class SettingsPanel(Panel):
             reset_score_button_action: typing.Callable,
             update_theme_action: typing.Callable,
             update_scale_action: typing.Callable,
-            reset_settings_action: typing.Callable
+            reset_settings_action: typing.Callable,
+            update_ai_player_action: typing.Callable,
     ):
         super().__init__(sprite_groups)
         settings_panel_sprite = CordSpriteObject(
@@ -472,7 +551,7 @@ class SettingsPanel(Panel):
             (
                 32 * 5 * data.settings.scale,
                 self.sprite_groups.top_panel.top_panel_sprite.rect.bottom
-                + 43 * 5 * data.settings.scale,
+                + 55 * 5 * data.settings.scale,
             ),
         )
         rules_button = Button(
@@ -534,6 +613,13 @@ class SettingsPanel(Panel):
             ),
             reset_score_button_action,
         )
+        ai_text = CordSpriteObject(
+            "ai_text",
+            (
+                settings_panel_sprite.rect.center[0],
+                reset_score_button.rect.bottom + 13.5 * 5 * data.settings.scale,
+            ),
+        )
 
         self.theme_choice = Choice(update_theme_action)
         self.basic_theme_button_frame = ChoiceButton(
@@ -588,6 +674,21 @@ class SettingsPanel(Panel):
             self.resolution_choice,
             (2,),
         )
+
+        self.ai_player_choice = Choice(update_ai_player_action)
+        ai_player_buttons = [
+            ChoiceButton(
+                "ai_player_button",
+                (
+                    42 * data.settings.scale,
+                    ai_text.rect.top + row * 5 * data.settings.scale,
+                ),
+                data.settings.ai_player == ai_player,
+                self.ai_player_choice,
+                (ai_player,),
+            )
+            for row, ai_player in ((8.5, None), (14.5, CROSS), (20.5, ZERO))
+        ]
         self.add_sprite(
             settings_panel_sprite,
             rules_button,
@@ -603,6 +704,8 @@ class SettingsPanel(Panel):
             game_settings_text,
             reset_settings_button,
             reset_score_button,
+            ai_text,
+            *ai_player_buttons,
             active_state=True,
         )
 
@@ -717,14 +820,18 @@ class StartPanel(Panel):
         self.active = True
 
 
-class SpriteGroups(pygame.sprite.Group):
+class SpriteGroups(pygame.sprite.LayeredDirty):
     def __init__(
             self,
             game,
             update_theme_action,
             update_scale_action,
             reset_settings_action,
+            update_ai_player_action,
     ):
+        # interactive sprites among the shown ones, for hover and clicks
+        self.hit_grid = HitGrid()
+        self.hovered = None
         super().__init__()
         self.game = game
         self.field = Field(self)
@@ -736,6 +843,7 @@ class SpriteGroups(pygame.sprite.Group):
             update_theme_action,
             update_scale_action,
             reset_settings_action,
+            update_ai_player_action,
         )
         self.info_panel = InfoPanel(self, self.open_field)
         self.bottom_panel = BottomPanel(self)
@@ -790,16 +898,59 @@ class SpriteGroups(pygame.sprite.Group):
             if event is not None and event.type == pygame.KEYDOWN and pygame.key.get_pressed()[pygame.K_SPACE]:
                 self.restart_button_action()
 
-        for group in self.groups:
-            self.add(group.sprite_group)
-            self.remove(sprite for sprite in group.sprites if sprite not in group.sprite_group)
-        super().update(event)
+        if (
+            event is not None
+            and event.type == pygame.KEYDOWN
+            and event.mod & pygame.KMOD_CTRL
+            and not (self.start_panel.active or self.settings_panel.active or self.info_panel.active)
+        ):
+            if event.key == pygame.K_z and not event.mod & pygame.KMOD_SHIFT:
+                self.field.undo()
+            elif event.key == pygame.K_y or event.key == pygame.K_z:
+                self.field.redo()
+
+        self.field.update_ai()
+
+        # only the sprite under the mouse gets hover and click events
+        if event is None:
+            self.hover(pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEMOTION:
+            self.hover(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.hover(event.pos)
+            if self.hovered is not None:
+                self.hovered.on_click()
+
+    def hover(self, pos: (int, int)) -> None:
+        sprite = next(
+            (sprite for sprite in self.hit_grid.sprites_at(pos) if sprite.active), None
+        )
+        if sprite is self.hovered:
+            return
+        if self.hovered is not None:
+            self.hovered.on_leave()
+        self.hovered = sprite
+        if sprite is not None:
+            sprite.on_enter()
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        if sprite.interactive:
+            self.hit_grid.add(sprite)
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        self.hit_grid.remove(sprite)
+
+    def sprite_moved(self, sprite) -> None:
+        self.hit_grid.move(sprite)
 
     def update_scale(self, old_scale: int, new_scale: int):
         self.field.update_scale()
         for group in self.groups:
             for sprite in group.sprites:
                 sprite.update_scale(old_scale, new_scale)
+        self.hit_grid.rebuild()
 
     def update_theme(self):
         for group in self.groups:
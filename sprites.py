@@ -3,6 +3,7 @@ from typing import Callable, Iterable
 import pygame
 
 from data import data
+from surfaces import NORMAL, HOVERED, CLICKED
 
 
 class Choice:
@@ -19,21 +20,62 @@ class Choice:
     def on_click(self, sender, *args):
         for button in self.buttons:
             button.clicked = button is sender
+            button.update_image()
         self.action(*args)
 
 
-class SpriteObject(pygame.sprite.Sprite):
+class TrackedSprite(pygame.sprite.DirtySprite):
+    """
+    Sprite for SpriteGroups' dirty-rect drawing. Assigning another image
+    or rect marks it dirty, code moving the rect in place calls moved()
+    itself.
+
+    Interactive sprites are hit-tested by SpriteGroups, which calls
+    on_enter(), on_leave() and on_click() of the active sprite under
+    the mouse.
+    """
+
+    interactive = False
+
+    @property
+    def image(self) -> pygame.Surface:
+        return self._image
+
+    @image.setter
+    def image(self, image: pygame.Surface) -> None:
+        if image is not getattr(self, "_image", None):
+            self._image = image
+            self.dirty = 1
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return self._rect
+
+    @rect.setter
+    def rect(self, rect: pygame.Rect) -> None:
+        self._rect = rect
+        self.moved()
+
+    def moved(self) -> None:
+        """Marks the sprite dirty and tells its groups that the rect changed."""
+        self.dirty = 1
+        for group in self.groups():
+            if hasattr(group, "sprite_moved"):
+                group.sprite_moved(self)
+
+
+class SpriteObject(TrackedSprite):
     def __init__(self, asset_name):
         super().__init__()
         self.asset = data.assets.get_asset(asset_name)
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
         self.rect = self.image.get_rect()
 
     def update_scale(self, old_scale: int, new_scale: int) -> None:
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
 
     def update_theme(self) -> None:
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
 
 
 class CordSpriteObject(SpriteObject):
@@ -43,6 +85,7 @@ class CordSpriteObject(SpriteObject):
 
     def set_pos(self, cords: (int, int)) -> None:
         self.rect.center = cords
+        self.moved()
 
     def update_scale(self, old_scale: int, new_scale: int) -> None:
         super().update_scale(old_scale, new_scale)
@@ -75,11 +118,14 @@ class Number(CordSpriteObject):
 
 
 class Button(CordSpriteObject):
+    interactive = True
+
     def __init__(self, asset_name, cords: (int, int), action: Callable = None):
         super().__init__(asset_name, cords)
         self.active = True
+        self.hovered = False
         self.basic_image = self.image
-        self.hovered_image = pygame.image.load(self.asset.hovered_path)
+        self.hovered_image = data.surfaces.get(self.asset, HOVERED)
         if action is None:
             self.action = lambda: None
         else:
@@ -90,36 +136,39 @@ class Button(CordSpriteObject):
 
     def set_active(self, active: bool) -> None:
         self.active = active
+        self.update_image()
 
-    def update(self, event: pygame.event.Event = None) -> None:
-        if self.active and self.collide(pygame.mouse.get_pos()):
-            if self.image is not self.hovered_image:
-                self.image = self.hovered_image
-        else:
-            if self.image is not self.basic_image:
-                self.image = self.basic_image
-        if (
-            event is not None
-            and event.type == pygame.MOUSEBUTTONUP
-            and self.active
-            and self.collide(event.pos)
-        ):
+    def on_enter(self) -> None:
+        self.hovered = True
+        self.update_image()
+
+    def on_leave(self) -> None:
+        self.hovered = False
+        self.update_image()
+
+    def on_click(self) -> None:
+        if self.active:
             # TODO
             # self.game.click_sound.play()
             self.action()
 
+    def update_image(self) -> None:
+        self.image = self.hovered_image if self.active and self.hovered else self.basic_image
+
     def update_scale(self, old_scale: int, new_scale: int) -> None:
         self.load_images()
+        self.update_image()
         old_topleft = self.rect.topleft
         self.rect = self.image.get_rect()
         self.rect.topleft = [i * (new_scale / old_scale) for i in old_topleft]
 
     def update_theme(self) -> None:
         self.load_images()
+        self.update_image()
 
     def load_images(self) -> None:
-        self.basic_image = pygame.image.load(self.asset.normal_path)
-        self.hovered_image = pygame.image.load(self.asset.hovered_path)
+        self.basic_image = data.surfaces.get(self.asset)
+        self.hovered_image = data.surfaces.get(self.asset, HOVERED)
         self.image = self.basic_image
 
 
@@ -133,42 +182,40 @@ class ChoiceButton(Button):
         click_args: Iterable,
     ):
         super().__init__(asset_name, cords)
-        self.clicked_image = pygame.image.load(self.asset.clicked_path)
+        self.clicked_image = data.surfaces.get(self.asset, CLICKED)
         self.clicked = clicked
         self.choice_group = choice_group
         self.choice_group.add(self)
         self.click_args = click_args
-        if self.clicked:
-            self.image = self.clicked_image
+        self.update_image()
 
-    def update(self, event: pygame.event.Event = None) -> None:
+    def on_click(self) -> None:
+        if not self.clicked:
+            self.choice_group.on_click(self, *self.click_args)
+
+    def update_image(self) -> None:
         if self.clicked:
             self.image = self.clicked_image
         else:
-            super().update()
-
-        if (
-            event is not None
-            and not self.clicked
-            and event.type == pygame.MOUSEBUTTONUP
-            and self.collide(event.pos)
-        ):
-            self.choice_group.on_click(self, *self.click_args)
+            super().update_image()
 
     def load_images(self) -> None:
         super().load_images()
-        self.clicked_image = pygame.image.load(self.asset.clicked_path)
+        self.clicked_image = data.surfaces.get(self.asset, CLICKED)
         if self.clicked:
             self.image = self.clicked_image
         else:
             self.image = self.basic_image
 
 
-class Cell(pygame.sprite.Sprite):
+class Cell(TrackedSprite):
+    interactive = True
+
     def __init__(self, subfield, x: int, y: int):
         super().__init__()
         self.subfield = subfield
         self.active = False
+        self.hovered = False
         self.cords = (x, y)
         self.load_images()
         self.rect = self.image.get_rect()
@@ -179,6 +226,7 @@ class Cell(pygame.sprite.Sprite):
 
     def set_active(self, active: bool) -> None:
         self.active = active
+        self.update_image()
 
     def get_cords(self) -> (int, int):
         return self.cords
@@ -191,24 +239,28 @@ class Cell(pygame.sprite.Sprite):
             self.subfield.rect.topleft[1]
             + self.subfield.field.sign_cords[self.cords[1]],
         )
+        self.moved()
 
-    def update(self, event=None):
-        super().update(event)
-        if self.active and self.collide(pygame.mouse.get_pos()):
-            if self.image is not self.hovered_image:
-                self.image = self.hovered_image
-        else:
-            if self.image is not self.basic_image:
-                self.image = self.basic_image
+    def on_enter(self) -> None:
+        self.hovered = True
+        self.update_image()
+
+    def on_leave(self) -> None:
+        self.hovered = False
+        self.update_image()
+
+    def on_click(self) -> None:
+        if self.active:
+            # TODO
+            # self.game.click_sound.play()
+            self.subfield.add_sign(*self.cords)
 
-        if event is not None and event.type == pygame.MOUSEBUTTONUP:
-            if self.active and self.collide(event.pos):
-                # TODO
-                # self.game.click_sound.play()
-                self.subfield.add_sign(*self.cords)
+    def update_image(self) -> None:
+        self.image = self.hovered_image if self.active and self.hovered else self.basic_image
 
     def update_scale(self, *args):
         self.load_images()
+        self.update_image()
         self.rect = self.image.get_rect()
         self.rect.topleft = (
             self.subfield.rect.topleft[0]
@@ -219,19 +271,19 @@ class Cell(pygame.sprite.Sprite):
 
     def update_theme(self):
         self.load_images()
+        self.update_image()
 
     def __str__(self) -> str:
         return f"(Cell[{self.cords[1]}][{self.cords[0]}] of {str(self.subfield)})"
 
     def load_images(self):
-        self.basic_image = pygame.Surface(
-            (data.settings.cell_width, data.settings.cell_width)
+        size = (data.settings.cell_width, data.settings.cell_width)
+        self.basic_image = data.surfaces.filled(
+            "cell", NORMAL, data.themes[data.settings.theme]["background_color"], size
         )
-        self.basic_image.fill(data.themes[data.settings.theme]["background_color"])
-        self.hovered_image = pygame.Surface(
-            (data.settings.cell_width, data.settings.cell_width)
+        self.hovered_image = data.surfaces.filled(
+            "cell", HOVERED, data.themes[data.settings.theme]["hovered_color"], size
         )
-        self.hovered_image.fill(data.themes[data.settings.theme]["hovered_color"])
         self.image = self.basic_image
 
     def collide(self, cords: (int, int)) -> bool:
@@ -242,16 +294,18 @@ class Cell(pygame.sprite.Sprite):
 
 
 class Sign(Cell):
+    interactive = False
+
     def __init__(self, asset_name, subfield, x: int, y: int):
         super().__init__(subfield, x, y)
         self.asset = data.assets.get_asset(asset_name)
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
 
-    def update(self, event=None):
+    def update_image(self) -> None:
         pass
 
     def update_scale(self, *args):
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
 
         self.rect = self.image.get_rect()
         self.rect.topleft = (
@@ -262,7 +316,7 @@ class Sign(Cell):
         )
 
     def update_theme(self):
-        self.image = pygame.image.load(self.asset.normal_path)
+        self.image = data.surfaces.get(self.asset)
 
 
 class Cross(Sign):
@@ -0,0 +1,54 @@
+import pygame
+
+from assets import Asset, assets
+from settings import settings
+
+# image states of an asset
+NORMAL = "normal"
+HOVERED = "hovered"
+CLICKED = "clicked"
+
+
+class SurfaceCache:
+    """
+    Flyweight of the surfaces sprites show. Every (asset, theme, scale,
+    state) is loaded from disk and converted once, all sprites showing
+    it share that surface, so memory grows with the variants and not
+    with the sprites. Sprites must not draw on the surfaces they get.
+
+    Switching back to a theme or scale seen before reads nothing from
+    disk, images of a variant not seen yet are recreated on first use.
+    """
+
+    def __init__(self) -> None:
+        self.surfaces = {}
+
+    def get(self, asset: Asset, state: str = NORMAL) -> pygame.Surface:
+        # normal images of non-themeable assets look the same in every theme
+        theme = settings.theme if asset.themeable or state != NORMAL else None
+        key = (asset.name, theme, settings.scale, state)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            assets.refresh(asset)
+            # only the requested path, assets which are not hoverable or
+            # clickable have no file names for those states
+            if state == HOVERED:
+                path = asset.hovered_path
+            elif state == CLICKED:
+                path = asset.clicked_path
+            else:
+                path = asset.normal_path
+            surface = self.surfaces[key] = pygame.image.load(path).convert_alpha()
+        return surface
+
+    def filled(self, name: str, state: str, color: tuple, size: (int, int)) -> pygame.Surface:
+        """Surface of one color, color and size must follow from the theme and scale."""
+        key = (name, settings.theme, settings.scale, state)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = pygame.Surface(size).convert()
+            surface.fill(color)
+        return surface
+
+
+surfaces = SurfaceCache()
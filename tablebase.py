@@ -0,0 +1,281 @@
+import contextlib
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+import typing
+
+from board import Board, transform_mask
+from movegen import iter_unique_moves
+from rules import Position
+from solver import EndgameSolver, WIN, DRAW, LOSS
+
+# positions per shard file as a power of two, 4 positions per byte
+SHARD_BITS = 22
+# 2-bit codes of the stored values, UNKNOWN marks positions which are
+# not canonical, already finished or in a shard that was not built
+UNKNOWN = 0
+CODES = {LOSS: 1, DRAW: 2, WIN: 3}
+VALUES = {code: value for value, code in CODES.items()}
+
+
+def layer_size(empty: int) -> int:
+    """Number of positions with empty empty cells, zero has a stone less or as many as cross."""
+    stones = 36 - empty
+    return math.comb(36, empty) * math.comb(stones, stones // 2)
+
+
+def _rank_subset(elements: list) -> int:
+    """Rank of a sorted subset in the colexicographic order of the combinatorial number system."""
+    return sum(math.comb(element, i + 1) for i, element in enumerate(elements))
+
+
+def _unrank_subset(rank: int, size: int) -> list:
+    elements = []
+    for i in range(size, 0, -1):
+        element = i - 1
+        while math.comb(element + 1, i) <= rank:
+            element += 1
+        rank -= math.comb(element, i)
+        elements.append(element)
+    return elements[::-1]
+
+
+def rank(cross: int, zero: int) -> int:
+    """
+    Perfect hash of a position within its layer: the rank of the empty
+    cells among all sets of as many cells, combined with the rank of
+    the zero stones among all stones.
+    """
+    occupied = cross | zero
+    empty_cells = [cell for cell in range(36) if not occupied >> cell & 1]
+    stones = [cell for cell in range(36) if occupied >> cell & 1]
+    zero_stones = [i for i, cell in enumerate(stones) if zero >> cell & 1]
+    return (
+        _rank_subset(empty_cells) * math.comb(len(stones), len(stones) // 2)
+        + _rank_subset(zero_stones)
+    )
+
+
+def unrank(empty: int, position_rank: int) -> (int, int):
+    stones = 36 - empty
+    empty_rank, zero_rank = divmod(position_rank, math.comb(stones, stones // 2))
+    empty_cells = set(_unrank_subset(empty_rank, empty))
+    stone_cells = [cell for cell in range(36) if cell not in empty_cells]
+    cross = zero = 0
+    zero_stones = set(_unrank_subset(zero_rank, stones // 2))
+    for i, cell in enumerate(stone_cells):
+        if i in zero_stones:
+            zero |= 1 << cell
+        else:
+            cross |= 1 << cell
+    return cross, zero
+
+
+def best_child(
+        board: Board,
+        child_value: typing.Callable[[Board], int | None],
+) -> tuple | None:
+    """
+    Value of board and its best move from the values of the positions
+    after every move, None if child_value does not know one of them.
+    """
+    player = board.player
+    best = LOSS - 1
+    best_move = None
+    # closing() unmakes the current move right away when the loop stops early
+    with contextlib.closing(iter_unique_moves(board)) as moves:
+        for move in moves:
+            conditions = board.conditions()
+            if conditions[player]:
+                value = WIN
+            elif conditions[1 - player]:
+                value = LOSS
+            elif conditions[2]:
+                value = DRAW
+            else:
+                value = child_value(board)
+                if value is None:
+                    return None
+                value = -value
+            if value > best:
+                best = value
+                best_move = move
+                if best == WIN:
+                    break
+    return best, best_move
+
+
+class Tablebase:
+    """
+    Reads a tablebase directory built by build(). Shard files are
+    memory-mapped on first use, a probe reads a single byte. A missing
+    directory makes an empty tablebase.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        try:
+            self.shard_bits = read_metadata(directory)["shard_bits"]
+        except FileNotFoundError:
+            self.shard_bits = SHARD_BITS
+            self.layers = set()
+        else:
+            self.layers = {
+                empty for empty in range(1, 37)
+                if os.path.isdir(os.path.join(directory, f"empty{empty}"))
+            }
+        self._shards = {}
+
+    def probe(self, board: Board) -> int | None:
+        """WIN, DRAW or LOSS for the player to move, None if the position is not in the tablebase."""
+        empty = 36 - board.stones
+        if empty not in self.layers:
+            return None
+        _, symmetry = board.canonical()
+        position_rank = rank(
+            transform_mask(board.masks[0], symmetry), transform_mask(board.masks[1], symmetry)
+        )
+        shard = self._shard(empty, position_rank >> self.shard_bits)
+        if shard is None:
+            return None
+        index = position_rank & (1 << self.shard_bits) - 1
+        code = shard[index >> 2] >> (index & 3) * 2 & 3
+        return VALUES.get(code)
+
+    def best_move(self, position: Position) -> tuple | None:
+        if position.is_terminal():
+            return None
+        return best_child(position.board(), self.probe)
+
+    def _shard(self, empty: int, shard: int) -> mmap.mmap | None:
+        if (empty, shard) not in self._shards:
+            try:
+                with open(shard_path(self.directory, empty, shard), "rb") as shard_file:
+                    self._shards[empty, shard] = mmap.mmap(
+                        shard_file.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+            except FileNotFoundError:
+                self._shards[empty, shard] = None
+        return self._shards[empty, shard]
+
+    def close(self) -> None:
+        for shard in self._shards.values():
+            if shard is not None:
+                shard.close()
+        self._shards = {}
+
+
+def shard_path(directory: str, empty: int, shard: int) -> str:
+    return os.path.join(directory, f"empty{empty}", f"{shard:06d}.bin")
+
+
+def read_metadata(directory: str) -> dict:
+    with open(os.path.join(directory, "tablebase.json")) as metadata_file:
+        return json.load(metadata_file)
+
+
+def generate_shard(directory: str, empty: int, shard: int) -> int:
+    """
+    Computes the values of one shard by retrograde analysis: the
+    positions after every move are looked up in the finished layer
+    with one empty cell less, or solved if that layer is not complete.
+    The shard file is written once it is done, so completed shards are
+    the checkpoints of an interrupted build. Returns the number of
+    stored values.
+    """
+    path = shard_path(directory, empty, shard)
+    if os.path.exists(path):
+        return 0
+
+    tablebase = Tablebase(directory)
+    solver = EndgameSolver(empty, table_bits=16)
+
+    def child_value(board: Board) -> int:
+        value = tablebase.probe(board)
+        if value is None:
+            value = solver.solve(Position(*board.masks)).value
+        return value
+
+    shard_size = 1 << tablebase.shard_bits
+    start = shard * shard_size
+    stop = min(start + shard_size, layer_size(empty))
+    data = bytearray((stop - start + 3) // 4)
+    stored = 0
+    for position_rank in range(start, stop):
+        board = Board(*unrank(empty, position_rank))
+        # non-canonical positions are looked up through their canonical form
+        if board.hashes[0] != min(board.hashes) or any(board.conditions()):
+            continue
+        value, _ = best_child(board, child_value)
+        index = position_rank - start
+        data[index >> 2] |= CODES[value] << (index & 3) * 2
+        stored += 1
+
+    tablebase.close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as shard_file:
+        shard_file.write(data)
+    os.replace(path + ".tmp", path)
+    return stored
+
+
+def _generate_shard(args: tuple) -> (int, int, int):
+    directory, empty, shard = args
+    return empty, shard, generate_shard(directory, empty, shard)
+
+
+def build(
+        directory: str,
+        max_empty: int,
+        shard_bits: int = SHARD_BITS,
+        processes: int | None = None,
+        max_shards: int | None = None,
+) -> None:
+    """
+    Builds the layers with 1 to max_empty empty cells, each from the
+    one below, spreading the shards of a layer across a process pool.
+    Shards that exist already are skipped, so running build again
+    resumes it. max_shards limits the shards built per layer.
+
+    Layers grow fast, the one with a single empty cell alone has
+    layer_size(1), about 1.6e11 positions (40 GB). A full build of the
+    36-cell board is out of reach, partial layers fall back to the
+    solver.
+    """
+    os.makedirs(directory, exist_ok=True)
+    try:
+        metadata = read_metadata(directory)
+    except FileNotFoundError:
+        metadata = {"shard_bits": shard_bits}
+        with open(os.path.join(directory, "tablebase.json"), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+    if metadata["shard_bits"] != shard_bits:
+        raise ValueError(f"{directory} has {metadata['shard_bits']} shard bits, not {shard_bits}")
+
+    with multiprocessing.Pool(processes) as pool:
+        for empty in range(1, max_empty + 1):
+            shards = -(-layer_size(empty) >> shard_bits)
+            if max_shards is not None:
+                shards = min(shards, max_shards)
+            start = time.monotonic()
+            tasks = [(directory, empty, shard) for shard in range(shards)]
+            for done, (_, shard, stored) in enumerate(
+                    pool.imap_unordered(_generate_shard, tasks), 1
+            ):
+                print(
+                    f"empty {empty}: shard {shard} with {stored} positions, "
+                    f"{done}/{shards} in {time.monotonic() - start:.1f} s"
+                )
+
+
+if __name__ == "__main__":
+    # python tablebase.py <directory> <max empty> [shards per layer]
+    build(
+        sys.argv[1],
+        int(sys.argv[2]),
+        max_shards=int(sys.argv[3]) if len(sys.argv) > 3 else None,
+    )
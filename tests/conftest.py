@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the game modules are top-level files of the repository root, and
+# settings reads config.json and settings.json from the working directory
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,33 @@
+import random
+
+from board import Board
+from rules import Game
+
+
+def random_masks(rng: random.Random, stones: int) -> (int, int):
+    """Cross and zero masks with stones stones, cross has as many as zero or one more."""
+    cells = rng.sample(range(36), stones)
+    zero_stones = stones // 2
+    cross = sum(1 << cell for cell in cells[zero_stones:])
+    zero = sum(1 << cell for cell in cells[:zero_stones])
+    return cross, zero
+
+
+def random_walk(rng: random.Random, board: Board, steps: int) -> None:
+    """Random places, rotations and undos on board, finished games are played on."""
+    for _ in range(steps):
+        choice = rng.random()
+        if board.history and choice < 0.2:
+            board.undo()
+        elif choice < 0.5 and not board.is_full():
+            board.place(rng.choice([index for index in range(36) if board.is_empty(index)]))
+        else:
+            board.rotate(rng.randrange(4), rng.random() < 0.5)
+
+
+def random_step(rng: random.Random, game: Game) -> None:
+    """Places or rotates, with both allowed either one, like a player of Field would."""
+    if game.can_place() and (not game.can_rotate() or rng.random() < 0.5):
+        game.place(rng.choice([cell for cell in range(36) if game.board.is_empty(cell)]))
+    else:
+        game.rotate(rng.randrange(4), rng.random() < 0.5)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from board import Board, CROSS, ZERO
+from evaluation import evaluate
+from helpers import random_masks
+from movegen import unique_moves
+from rules import DRAW
+
+np = pytest.importorskip("numpy")
+# numpy 1.x has no bitwise_count and batch refuses to import
+batch = pytest.importorskip("batch")
+
+
+def random_boards(rng: random.Random, count: int) -> list:
+    return [Board(*random_masks(rng, rng.randint(0, 36))) for _ in range(count)]
+
+
+def scalar_status(board: Board) -> int:
+    cross_won, zero_won, draw = board.conditions()
+    if draw:
+        return DRAW
+    if cross_won:
+        return CROSS
+    if zero_won:
+        return ZERO
+    return batch.ONGOING
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_evaluate_matches_scalar(seed):
+    rng = random.Random(seed)
+    boards = random_boards(rng, 500)
+    players = [rng.randrange(2) for _ in boards]
+    masks = np.array([board.masks for board in boards], dtype=np.uint64)
+    status, score = batch.evaluate(masks, np.array(players))
+    for board, player, board_status, board_score in zip(boards, players, status, score):
+        assert board_status == scalar_status(board)
+        expected = evaluate(board, player) if board_status == batch.ONGOING else 0
+        assert board_score == expected
+
+    for player in (CROSS, ZERO):
+        _, score = batch.evaluate(masks, player)
+        assert [int(value) for value in score] == [
+            evaluate(board, player) if not any(board.conditions()) else 0 for board in boards
+        ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cells_and_line_counts(seed):
+    rng = random.Random(seed)
+    boards = random_boards(rng, 200)
+    masks = np.array([board.masks for board in boards], dtype=np.uint64)
+    cells = batch.cells_from_masks(masks)
+    for board, board_cells in zip(boards, cells):
+        assert [int(cell) for cell in board_cells] == [
+            batch.EMPTY if board.get(index) is None else board.get(index) for index in range(36)
+        ]
+    assert (batch.masks_from_cells(cells) == masks).all()
+
+    counts = batch.line_counts(masks)
+    for board, board_counts in zip(boards, counts):
+        for player in (CROSS, ZERO):
+            assert board_counts[player].tolist() == board.line_counts(player)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ordered_moves_match_unique_moves(seed):
+    rng = random.Random(seed)
+    for board in random_boards(rng, 30):
+        if any(board.conditions()):
+            continue
+        masks = board.masks.copy()
+        assert batch.ordered_moves(board) == unique_moves(board, evaluate)
+        assert board.masks == masks
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from benchmark import LegacyBoard
+from board import (
+    Board, CROSS, ZERO, LINE_MASKS, QUADRANT_MASK, QUADRANT_STATES, ROTATED_STATES, STATE_PATTERNS,
+    index_from_row_col, packed_lines, quadrant_state, row_col_from_index,
+)
+from helpers import random_masks, random_walk
+from rules import DRAW, Position
+
+
+def assert_same_cells(board: Board, legacy: LegacyBoard) -> None:
+    assert LegacyBoard.from_board(board).field == legacy.field
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_place_rotate_undo_match_legacy(seed):
+    rng = random.Random(seed)
+    board = Board()
+    legacy = LegacyBoard()
+    # legacy boards before every move of board.history
+    legacy_history = []
+    for _ in range(300):
+        choice = rng.random()
+        if board.history and choice < 0.2:
+            board.undo()
+            legacy = legacy_history.pop()
+        elif choice < 0.5 and not board.is_full():
+            index = rng.choice([index for index in range(36) if board.is_empty(index)])
+            legacy_history.append(legacy.copy())
+            legacy.place(index, board.player)
+            board.place(index)
+        else:
+            quadrant, clockwise = rng.randrange(4), rng.random() < 0.5
+            legacy_history.append(legacy.copy())
+            legacy.rotate(quadrant, clockwise)
+            board.rotate(quadrant, clockwise)
+        assert_same_cells(board, legacy)
+        assert board.masks[CROSS] & board.masks[ZERO] == 0
+        assert board.stones == board.occupied.bit_count()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_masks_round_trip(seed):
+    rng = random.Random(seed)
+    for stones in range(37):
+        cross, zero = random_masks(rng, stones)
+        board = Board(cross, zero)
+        assert board.masks == [cross, zero]
+        assert board.player == stones % 2
+        for index in range(36):
+            expected = CROSS if cross >> index & 1 else ZERO if zero >> index & 1 else None
+            assert board.get(index) == expected
+        assert Board(*board.copy().masks) == board
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_conditions_match_legacy(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        board = Board(*random_masks(rng, rng.randint(9, 36)))
+        conditions = board.conditions()
+        assert conditions == LegacyBoard.from_board(board).win_draw_check()
+
+        cross_won, zero_won, draw = conditions
+        result = Position(*board.masks).result()
+        if draw:
+            assert result == DRAW
+        elif cross_won or zero_won:
+            assert result == (CROSS if cross_won else ZERO)
+        else:
+            assert result is None
+
+        for player in (CROSS, ZERO):
+            mask = board.masks[player]
+            assert board.winning_lines(player) == tuple(
+                i for i, line in enumerate(LINE_MASKS) if mask & line == line
+            )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_line_counts(seed):
+    rng = random.Random(seed)
+    board = Board()
+    for _ in range(300):
+        random_walk(rng, board, 1)
+        assert board.lines == packed_lines(*board.masks)
+        for player in (CROSS, ZERO):
+            mask = board.masks[player]
+            assert board.line_counts(player) == [(mask & line).bit_count() for line in LINE_MASKS]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rotated_states_match_legacy(seed):
+    rng = random.Random(seed)
+    # the state tables are filled by the first Board
+    Board()
+    for _ in range(500):
+        state = rng.randrange(QUADRANT_STATES)
+        cross, zero = STATE_PATTERNS[state]
+        assert quadrant_state(cross, zero) == state
+        for clockwise in (False, True):
+            legacy = LegacyBoard.from_board(Board(cross, zero))
+            legacy.rotate(0, clockwise)
+            rotated = [0, 0]
+            for local in range(9):
+                player = legacy.field[0][local // 3][local % 3]
+                if player is not None:
+                    rotated[player] |= 1 << local
+            assert STATE_PATTERNS[ROTATED_STATES[clockwise][state]] == tuple(rotated)
+            assert ROTATED_STATES[not clockwise][ROTATED_STATES[clockwise][state]] == state
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_states(seed):
+    rng = random.Random(seed)
+    board = Board()
+    for _ in range(300):
+        random_walk(rng, board, 1)
+        cross, zero = board.masks
+        assert board.states == [
+            quadrant_state(
+                cross >> quadrant * 9 & QUADRANT_MASK, zero >> quadrant * 9 & QUADRANT_MASK
+            )
+            for quadrant in range(4)
+        ]
+
+
+def test_row_col_round_trip():
+    for index in range(36):
+        assert index_from_row_col(*row_col_from_index(index)) == index
+
+
+def test_invalid_moves():
+    board = Board()
+    board.place(0)
+    with pytest.raises(ValueError):
+        board.place(0)
+    with pytest.raises(ValueError):
+        board.place(36)
+    with pytest.raises(ValueError):
+        board.rotate(4, True)
@@ -0,0 +1,92 @@
+import contextlib
+import random
+
+import pytest
+
+from board import Board
+from evaluation import evaluate
+from helpers import random_masks
+from movegen import generate_moves, iter_unique_moves, make_move, unique_moves, unmake_move
+from rules import Position
+
+
+def random_board(rng: random.Random) -> Board:
+    while True:
+        board = Board(*random_masks(rng, rng.randint(0, 32)))
+        if not any(board.conditions()):
+            return board
+
+
+def canonical_after(board: Board, move) -> int:
+    make_move(board, move)
+    key = board.canonical_hash()
+    unmake_move(board, move)
+    return key
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unique_moves_cover_all_moves_once(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        board = random_board(rng)
+        masks = board.masks.copy()
+        moves = unique_moves(board)
+        assert board.masks == masks and not board.history
+
+        legal = set(generate_moves(board))
+        assert set(moves) <= legal
+        keys = [canonical_after(board, move) for move in moves]
+        assert len(set(keys)) == len(keys)
+        assert set(keys) == {canonical_after(board, move) for move in legal}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generate_moves_match_position(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        board = random_board(rng)
+        position = Position(*board.masks)
+        for move in generate_moves(board):
+            make_move(board, move)
+            assert Position(*board.masks) == position.play(move)
+            unmake_move(board, move)
+        assert board.masks == [position.cross, position.zero]
+
+
+def move_rank(board: Board, move, player: int) -> (int, int):
+    """Sort key of unique_moves: wins, then the others by score, then losses."""
+    make_move(board, move)
+    conditions = board.conditions()
+    if conditions[player]:
+        rank = (0, 0)
+    elif conditions[1 - player]:
+        rank = (2, 0)
+    else:
+        rank = (1, 0 if conditions[2] else -evaluate(board, player))
+    unmake_move(board, move)
+    return rank
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scored_moves_are_ordered(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        board = random_board(rng)
+        moves = unique_moves(board, evaluate)
+        assert set(moves) == set(unique_moves(board))
+        ranks = [move_rank(board, move, board.player) for move in moves]
+        assert ranks == sorted(ranks)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_closing_early_restores_the_board(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        board = random_board(rng)
+        masks, hashes = board.masks.copy(), board.hashes.copy()
+        stop = rng.randrange(8)
+        with contextlib.closing(iter_unique_moves(board)) as moves:
+            for i, _ in enumerate(moves):
+                if i == stop:
+                    break
+        assert board.masks == masks and board.hashes == hashes and not board.history
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from helpers import random_step
+from records import (
+    MAGIC, GameWriter, _read_varint, _write_varint, append_game, decode_game, encode_game,
+    read_games,
+)
+from rules import Game
+
+
+def random_games(rng: random.Random, count: int) -> list:
+    games = []
+    for _ in range(count):
+        game = Game()
+        while not game.is_over():
+            random_step(rng, game)
+        games.append((game.moves, game.result()))
+    return games
+
+
+@pytest.mark.parametrize(
+    "value, size",
+    [(0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3), (2 ** 21 - 1, 3), (2 ** 21, 4)],
+)
+def test_varint_boundaries(value, size):
+    buffer = bytearray(b"\xff")
+    _write_varint(buffer, value)
+    assert len(buffer) == 1 + size
+    assert _read_varint(buffer, 1) == (value, 1 + size)
+    with pytest.raises(ValueError):
+        _read_varint(buffer[:-1], 1)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_encode_round_trip(seed):
+    rng = random.Random(seed)
+    for moves, result in random_games(rng, 20):
+        assert decode_game(encode_game(moves, result)) == (moves, result)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_file_round_trip(seed, tmp_path):
+    rng = random.Random(seed)
+    path = str(tmp_path / "games.bin")
+    games = random_games(rng, 30)
+    with GameWriter(path) as writer:
+        for moves, result in games[:20]:
+            writer.write(moves, result)
+    # appending to an existing file keeps a single header
+    for moves, result in games[20:]:
+        append_game(path, moves, result)
+    assert list(read_games(path)) == games
+
+
+def test_truncated_file(tmp_path):
+    path = tmp_path / "games.bin"
+    games = random_games(random.Random(0), 5)
+    for moves, result in games:
+        append_game(str(path), moves, result)
+    data = path.read_bytes()
+    # byte offsets where a game ends and the file may be cut cleanly
+    ends = {len(MAGIC)}
+    with GameWriter(str(tmp_path / "prefix.bin")) as writer:
+        for moves, result in games:
+            writer.write(moves, result)
+            writer.file.flush()
+            ends.add(writer.file.tell())
+
+    truncated = tmp_path / "truncated.bin"
+    for size in range(len(MAGIC), len(data)):
+        truncated.write_bytes(data[:size])
+        if size in ends:
+            assert list(read_games(str(truncated))) == games[:sorted(ends).index(size)]
+        else:
+            with pytest.raises(ValueError):
+                list(read_games(str(truncated)))
+
+
+def test_missing_empty_and_foreign_files(tmp_path):
+    assert list(read_games(str(tmp_path / "missing.bin"))) == []
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert list(read_games(str(empty))) == []
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"PNG\x00\x01\x02")
+    with pytest.raises(ValueError):
+        list(read_games(str(foreign)))
@@ -0,0 +1,186 @@
+import random
+
+import pytest
+
+from board import FULL_MASK
+from helpers import random_masks, random_step
+from rules import Game, Move, Position, has_empty_quadrant
+
+
+def snapshot(game: Game) -> tuple:
+    return game.board.masks.copy(), game.step, game.moves.copy(), game._placed
+
+
+def random_game(rng: random.Random) -> (Game, list):
+    """A finished random game and the snapshots before and after every step."""
+    game = Game()
+    snapshots = [snapshot(game)]
+    while not game.is_over():
+        random_step(rng, game)
+        snapshots.append(snapshot(game))
+    return game, snapshots
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_redo_restore_every_step(seed):
+    rng = random.Random(seed)
+    game, snapshots = random_game(rng)
+    for expected in reversed(snapshots[:-1]):
+        game.undo()
+        assert snapshot(game) == expected
+    assert not game.can_undo()
+    for expected in snapshots[1:]:
+        game.redo()
+        assert snapshot(game) == expected
+    assert not game.can_redo()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_undo_redo(seed):
+    rng = random.Random(seed)
+    game, snapshots = random_game(rng)
+    # snapshots[current] is the state of game
+    current = len(snapshots) - 1
+    for _ in range(200):
+        if game.can_undo() and (not game.can_redo() or rng.random() < 0.5):
+            game.undo()
+            current -= 1
+        else:
+            game.redo()
+            current += 1
+        assert snapshot(game) == snapshots[current]
+        assert game.can_undo() == (current > 0)
+        assert game.can_redo() == (current < len(snapshots) - 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_new_step_drops_redo(seed):
+    rng = random.Random(seed)
+    game, snapshots = random_game(rng)
+    for _ in range(rng.randint(1, len(snapshots) - 1)):
+        game.undo()
+    assert game.can_redo()
+    before = snapshot(game)
+    random_step(rng, game)
+    assert not game.can_redo()
+    game.undo()
+    assert snapshot(game) == before
+    assert game.can_redo()
+    with pytest.raises(ValueError):
+        Game().undo()
+    with pytest.raises(ValueError):
+        Game().redo()
+
+
+def random_position(rng: random.Random, stones: int, terminal: bool = False) -> Position:
+    while True:
+        position = Position(*random_masks(rng, stones))
+        if position.is_terminal() == terminal:
+            return position
+
+
+ROTATIONS = tuple((quadrant, clockwise) for quadrant in range(4) for clockwise in (False, True))
+
+
+def placed(position: Position, cell: int) -> Position:
+    """position after the player to move placed on cell, without rotating."""
+    if position.player:
+        return Position(position.cross, position.zero | 1 << cell)
+    return Position(position.cross | 1 << cell, position.zero)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_legal_moves(seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        position = random_position(rng, rng.randint(0, 35))
+        moves = list(position.legal_moves())
+        assert len(moves) == len(set(moves))
+        expected = set()
+        for cell in range(36):
+            if position.occupied >> cell & 1:
+                continue
+            # a placement which ends the game is a move of its own
+            if placed(position, cell).is_terminal():
+                expected.add(Move(cell))
+            else:
+                expected.update(Move(cell, *rotation) for rotation in ROTATIONS)
+        assert set(moves) == expected
+        for move in moves:
+            assert position.play(move).occupied.bit_count() == position.occupied.bit_count() + 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_moves_when_over(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        position = random_position(rng, rng.randint(9, 36), terminal=True)
+        assert list(position.legal_moves()) == []
+        cell = next((cell for cell in range(36) if not position.occupied >> cell & 1), 0)
+        with pytest.raises(ValueError):
+            position.play(Move(cell, 0, True))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_last_empty_cell(seed):
+    rng = random.Random(seed)
+    position = random_position(rng, 35)
+    cell = (FULL_MASK ^ position.occupied).bit_length() - 1
+    assert list(position.legal_moves()) == [Move(cell)]
+    after = position.play(Move(cell))
+    assert after.occupied == FULL_MASK and after.is_terminal()
+    full = random_position(rng, 36, terminal=True)
+    assert full.result() is not None and list(full.legal_moves()) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_play_errors(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        position = random_position(rng, rng.randint(1, 30))
+        occupied = [cell for cell in range(36) if position.occupied >> cell & 1]
+        with pytest.raises(ValueError):
+            position.play(Move(rng.choice(occupied), 0, True))
+
+        cell = rng.choice([cell for cell in range(36) if not position.occupied >> cell & 1])
+        after = placed(position, cell)
+        if after.is_terminal():
+            assert position.play(Move(cell)) == after
+        elif has_empty_quadrant(after.occupied):
+            # with an empty quadrant the rotation can be skipped
+            assert position.play(Move(cell)) == after
+        else:
+            with pytest.raises(ValueError):
+                position.play(Move(cell))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_string_round_trip(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        position = Position(*random_masks(rng, rng.randint(0, 36)))
+        string = position.to_string()
+        assert len(string) == 36 and set(string) <= set("xo.")
+        assert Position.from_string(string) == position
+        assert str(position).replace("\n", "") == string
+        for move in position.legal_moves():
+            assert Move.from_string(str(move)) == move
+
+
+@pytest.mark.parametrize("string", ["", "." * 35, "." * 37, "." * 35 + "X", "." * 35 + " "])
+def test_invalid_strings(string):
+    with pytest.raises(ValueError):
+        Position.from_string(string)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_dumps_loads_round_trip(seed):
+    rng = random.Random(seed)
+    game = Game()
+    snapshots = []
+    while not game.is_over():
+        random_step(rng, game)
+        snapshots.append(snapshot(game))
+        # unfinished games with a pending placement round-trip as well
+        assert snapshot(Game.loads(game.dumps())) == snapshots[-1]
+    assert Game.loads(game.dumps()).result() == game.result()
@@ -0,0 +1,49 @@
+import functools
+import random
+
+import pytest
+
+from evaluation import evaluate
+from helpers import random_masks
+from rules import DRAW, Position
+from solver import EndgameSolver, WIN, LOSS
+
+
+@functools.cache
+def brute_force(position: Position) -> int:
+    """Game value for the player to move by plain negamax over all legal moves."""
+    result = position.result()
+    if result == DRAW:
+        return 0
+    if result is not None:
+        return WIN if result == position.player else LOSS
+    return max(-brute_force(position.play(move)) for move in position.legal_moves())
+
+
+def random_endgame(rng: random.Random, empty: int) -> Position:
+    while True:
+        position = Position(*random_masks(rng, 36 - empty))
+        if not position.is_terminal():
+            return position
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("score", [None, evaluate])
+def test_solver_matches_brute_force(seed, score):
+    rng = random.Random(seed)
+    solver = EndgameSolver(max_empty=4, table_bits=12, score=score)
+    for _ in range(20):
+        position = random_endgame(rng, rng.randint(1, 4))
+        solution = solver.solve(position)
+        assert solution.value == brute_force(position)
+        assert -brute_force(position.play(solution.move)) == solution.value
+        assert 1 <= solution.proof_size <= solution.nodes + 1
+        # a second solve starts from the filled table
+        assert solver.solve(position).value == solution.value
+
+
+def test_solver_limits():
+    solver = EndgameSolver(max_empty=2)
+    with pytest.raises(ValueError):
+        solver.solve(Position())
+    assert not solver.can_solve(Position())
@@ -0,0 +1,37 @@
+import os
+import shutil
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+pytest.importorskip("PIL")
+
+from assets import Asset, assets
+from settings import settings
+from surfaces import SurfaceCache
+
+
+@pytest.fixture
+def display():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def test_plain_asset(display, tmp_path, monkeypatch):
+    base_img_path = settings.base_img_path
+    # generated images go to a temporary data folder and the database is left alone
+    monkeypatch.setattr(settings, "data_folder", str(tmp_path))
+    monkeypatch.setattr(assets, "_save_asset", lambda asset: None)
+    os.makedirs(settings.base_img_path)
+    shutil.copy(os.path.join(base_img_path, "x_won_text.png"), settings.base_img_path)
+
+    asset = Asset(0, "x_won_text", True, False, False, "x_won_text.png")
+    surfaces = SurfaceCache()
+    surface = surfaces.get(asset)
+    assert os.path.exists(asset.normal_path)
+    assert asset.hovered_filename is None and asset.clicked_filename is None
+    assert surface.get_width() > 0
+    assert surfaces.get(asset) is surface
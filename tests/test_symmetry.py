@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from board import (
+    Board, INVERSE_SYMMETRIES, index_from_row_col, row_col_from_index, transform_mask,
+    transform_move, zobrist_hashes,
+)
+from helpers import random_masks, random_walk
+from rules import Move, Position
+from transposition import TranspositionTable, EXACT
+
+# the dihedral group of the 6x6 grid written out by hand
+DIHEDRAL = (
+    lambda row, col: (row, col),
+    lambda row, col: (col, 5 - row),
+    lambda row, col: (5 - row, 5 - col),
+    lambda row, col: (5 - col, row),
+    lambda row, col: (row, 5 - col),
+    lambda row, col: (5 - row, col),
+    lambda row, col: (col, row),
+    lambda row, col: (5 - col, 5 - row),
+)
+
+
+def dihedral_mask(mask: int, function) -> int:
+    return sum(
+        1 << index_from_row_col(*function(*row_col_from_index(index)))
+        for index in range(36) if mask >> index & 1
+    )
+
+
+def transformed(position: Position, symmetry: int) -> Position:
+    return Position(
+        transform_mask(position.cross, symmetry), transform_mask(position.zero, symmetry)
+    )
+
+
+def random_move(rng: random.Random, position: Position) -> Move:
+    return rng.choice(list(position.legal_moves()))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_transform_mask_is_the_dihedral_group(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        cross, zero = random_masks(rng, rng.randint(0, 36))
+        assert {
+            (transform_mask(cross, symmetry), transform_mask(zero, symmetry))
+            for symmetry in range(8)
+        } == {
+            (dihedral_mask(cross, function), dihedral_mask(zero, function))
+            for function in DIHEDRAL
+        }
+        for symmetry in range(8):
+            inverse = INVERSE_SYMMETRIES[symmetry]
+            assert transform_mask(transform_mask(cross, symmetry), inverse) == cross
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_hashes(seed):
+    rng = random.Random(seed)
+    board = Board()
+    for _ in range(300):
+        random_walk(rng, board, 1)
+        assert board.hashes == zobrist_hashes(*board.masks)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_canonical_hash_is_symmetry_invariant(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        board = Board(*random_masks(rng, rng.randint(0, 36)))
+        key, symmetry = board.canonical()
+        canonical = Board(*(transform_mask(mask, symmetry) for mask in board.masks))
+        assert canonical.hashes[0] == key
+        for function in DIHEDRAL:
+            variant = Board(*(dihedral_mask(mask, function) for mask in board.masks))
+            assert variant.canonical_hash() == key
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_transform_move_commutes_with_play(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        position = Position(*random_masks(rng, rng.randint(0, 30)))
+        if position.is_terminal():
+            continue
+        move = random_move(rng, position)
+        after = position.play(move)
+        for symmetry in range(8):
+            variant = transformed(position, symmetry)
+            assert variant.play(Move(*transform_move(*move, symmetry))) == transformed(
+                after, symmetry
+            )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_table_moves_map_to_symmetric_positions(seed):
+    rng = random.Random(seed)
+    table = TranspositionTable(16)
+    for _ in range(100):
+        position = Position(*random_masks(rng, rng.randint(0, 30)))
+        if position.is_terminal():
+            continue
+        move = random_move(rng, position)
+        table.store(position.board(), 1, EXACT, 0, move)
+        variant = transformed(position, rng.randrange(8))
+        _, _, _, variant_move = table.probe(variant.board())
+        assert variant_move in set(variant.legal_moves())
+        assert variant.play(variant_move).board().canonical_hash() == (
+            position.play(move).board().canonical_hash()
+        )
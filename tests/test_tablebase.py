@@ -0,0 +1,100 @@
+import json
+import os
+import random
+
+import pytest
+
+from board import Board, transform_mask
+from helpers import random_masks
+from rules import Position
+from solver import EndgameSolver
+from tablebase import (
+    Tablebase, best_child, generate_shard, layer_size, rank, shard_path, unrank,
+)
+
+SHARD_BITS = 6
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rank_round_trip(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        empty = rng.randint(0, 36)
+        cross, zero = random_masks(rng, 36 - empty)
+        position_rank = rank(cross, zero)
+        assert 0 <= position_rank < layer_size(empty)
+        assert unrank(empty, position_rank) == (cross, zero)
+
+
+@pytest.mark.parametrize("empty", [36, 35, 34, 33])
+def test_rank_is_a_bijection(empty):
+    positions = {unrank(empty, position_rank) for position_rank in range(layer_size(empty))}
+    assert len(positions) == layer_size(empty)
+    for cross, zero in positions:
+        assert cross & zero == 0
+        assert (cross | zero).bit_count() == 36 - empty
+        assert zero.bit_count() == (36 - empty) // 2
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_probe_matches_solver(seed, tmp_path):
+    rng = random.Random(seed)
+    directory = str(tmp_path)
+    with open(os.path.join(directory, "tablebase.json"), "w") as metadata_file:
+        json.dump({"shard_bits": SHARD_BITS}, metadata_file)
+    empty = 2
+    # most positions of a shard are won already, so build the shard of a
+    # canonical position that is not
+    while True:
+        board = Board(*random_masks(rng, 36 - empty))
+        if board.hashes[0] == min(board.hashes) and not any(board.conditions()):
+            break
+    shard = rank(*board.masks) >> SHARD_BITS
+    generate_shard(directory, empty, shard)
+    assert os.path.exists(shard_path(directory, empty, shard))
+
+    tablebase = Tablebase(directory)
+    solver = EndgameSolver(empty)
+    probed = 0
+    for position_rank in range(shard << SHARD_BITS, shard + 1 << SHARD_BITS):
+        board = Board(*unrank(empty, position_rank))
+        if board.hashes[0] != min(board.hashes) or any(board.conditions()):
+            continue
+        value = solver.solve(Position(*board.masks)).value
+        assert tablebase.probe(board) == value
+        # symmetric variants are probed through the canonical position
+        symmetry = rng.randrange(8)
+        variant = Board(*(transform_mask(mask, symmetry) for mask in board.masks))
+        assert tablebase.probe(variant) == value
+        probed += 1
+    tablebase.close()
+    assert probed
+
+
+def test_missing_tablebase(tmp_path):
+    tablebase = Tablebase(str(tmp_path / "missing"))
+    assert tablebase.probe(Board()) is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_child_matches_solver(seed):
+    rng = random.Random(seed)
+    solver = EndgameSolver(max_empty=4, table_bits=12)
+
+    def child_value(board: Board) -> int:
+        return solver.solve(Position(*board.masks)).value
+
+    for _ in range(20):
+        position = Position(*random_masks(rng, 36 - rng.randint(1, 4)))
+        if position.is_terminal():
+            continue
+        board = position.board()
+        masks = board.masks.copy()
+        value, move = best_child(board, child_value)
+        assert board.masks == masks
+        assert value == solver.solve(position).value
+        child = position.play(move)
+        if not child.is_terminal():
+            assert -solver.solve(child).value == value
+        # an unknown child value makes the whole position unknown
+        assert best_child(board, lambda child_board: None) in (None, (value, move))
@@ -0,0 +1,64 @@
+import math
+import random
+
+import pytest
+
+from tournament import summary, wilson_interval
+
+
+def game_results(rng: random.Random, first: str, second: str, outcomes: str) -> list:
+    """Results of first against second with colors alternating, outcomes is a string of w, d and l."""
+    results = []
+    for i, outcome in enumerate(outcomes):
+        cross, zero = (first, second) if i % 2 == 0 else (second, first)
+        if outcome == "d":
+            result = "draw"
+        else:
+            result = "cross" if (outcome == "w") == (cross == first) else "zero"
+        results.append({"game": i, "cross": cross, "zero": zero, "result": result})
+    rng.shuffle(results)
+    return results
+
+
+@pytest.mark.parametrize("outcomes", ["wwww", "llll", "dddd"])
+def test_lopsided_match(outcomes):
+    stats = summary(game_results(random.Random(0), "a", "b", outcomes), "a", "b")
+    assert stats["games"] == 4
+    low, high = stats["score_interval"]
+    assert 0.0 <= low < high <= 1.0
+    assert high - low > 0.3
+    elo_low, elo_high = stats["elo_interval"]
+    if outcomes == "wwww":
+        assert stats["score"] == 1.0 and low < 0.6 and math.isfinite(elo_low)
+    elif outcomes == "llll":
+        assert stats["score"] == 0.0 and high > 0.4 and math.isfinite(elo_high)
+    else:
+        assert stats["score"] == 0.5 and stats["elo"] == 0
+        assert math.isfinite(elo_low) and elo_low == pytest.approx(-elo_high)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_summary_counts_and_interval(seed):
+    rng = random.Random(seed)
+    outcomes = "".join(rng.choice("wdl") for _ in range(rng.randint(1, 200)))
+    results = game_results(rng, "a", "b", outcomes)
+    # games between other engines do not count
+    results += game_results(rng, "b", "c", "wl")
+    stats = summary(results, "a", "b")
+    assert (stats["wins"], stats["draws"], stats["losses"]) == tuple(
+        outcomes.count(outcome) for outcome in "wdl"
+    )
+    low, high = stats["score_interval"]
+    assert low <= stats["score"] <= high
+    assert (low, high) == wilson_interval(stats["score"], stats["games"])
+    mirrored = summary(results, "b", "a")
+    assert mirrored["score"] == pytest.approx(1 - stats["score"])
+    assert mirrored["score_interval"][0] == pytest.approx(1 - high)
+
+
+def test_interval_narrows_with_games():
+    widths = [wilson_interval(0.75, games) for games in (4, 40, 400)]
+    assert [high - low for low, high in widths] == sorted(
+        (high - low for low, high in widths), reverse=True
+    )
+    assert summary([], "a", "b") == {"games": 0}
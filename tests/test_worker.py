@@ -0,0 +1,47 @@
+import functools
+import time
+
+import pytest
+
+from ai import AlphaBetaEngine
+from rules import Position
+from worker import EngineWorker
+
+# a search answers in about TIME_LIMIT seconds, one running into TIMEOUT hangs
+TIME_LIMIT = 0.2
+TIMEOUT = 10
+
+POSITION = Position.from_string("......................xo.....x.....o")
+
+
+@pytest.fixture(params=[False, True], ids=["threads", "processes"])
+def worker(request):
+    worker = EngineWorker(
+        functools.partial(AlphaBetaEngine, TIME_LIMIT, table_bits=12),
+        processes=request.param,
+    )
+    yield worker
+    worker.shutdown()
+
+
+def test_search(worker):
+    move = worker.start(POSITION).result(TIMEOUT)
+    assert move in set(POSITION.legal_moves())
+
+
+def test_cancelled_ponder_does_not_block(worker):
+    # the ponder is likely still queued when it is cancelled
+    worker.ponder(POSITION)
+    worker.cancel()
+    move = worker.start(POSITION).result(TIMEOUT)
+    assert move in set(POSITION.legal_moves())
+
+
+@pytest.mark.parametrize("delay", [0.0, 0.001, 0.1])
+def test_start_after_ponder(worker, delay):
+    # pondering searches without a time limit until start() stops it
+    worker.ponder(POSITION)
+    time.sleep(delay)
+    move = worker.start(POSITION).result(TIMEOUT)
+    assert move in set(POSITION.legal_moves())
+    assert not worker.pondering
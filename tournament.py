@@ -0,0 +1,257 @@
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from ai import AlphaBetaEngine
+from board import CROSS, ZERO
+from mcts import MCTSEngine
+from rules import DRAW, Move, Position
+
+ENGINES = {
+    "alphabeta": AlphaBetaEngine,
+    "mcts": MCTSEngine,
+}
+RESULT_NAMES = {CROSS: "cross", ZERO: "zero", DRAW: "draw"}
+# two-sided 95% quantile of the normal distribution
+Z_95 = 1.96
+
+
+def parse_engine(spec: str) -> (type, dict):
+    """
+    "name" or "name:key=value,key=value" to an engine class and its
+    keyword arguments, values are read as JSON when possible.
+    """
+    name, _, arguments = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r}, expected one of {', '.join(ENGINES)}")
+    kwargs = {}
+    for argument in filter(None, arguments.split(",")):
+        key, _, value = argument.partition("=")
+        try:
+            kwargs[key] = json.loads(value)
+        except json.JSONDecodeError:
+            kwargs[key] = value
+    if ENGINES[name] is MCTSEngine:
+        # pool workers are daemonic and cannot start pools of their own
+        kwargs.setdefault("workers", 1)
+    return ENGINES[name], kwargs
+
+
+def create_engine(spec: str):
+    engine_class, kwargs = parse_engine(spec)
+    return engine_class(**kwargs)
+
+
+def random_opening(rng: random.Random, plies: int) -> list:
+    """plies random moves which do not end the game."""
+    while True:
+        position = Position()
+        moves = []
+        for _ in range(plies):
+            move = rng.choice(list(position.legal_moves()))
+            position = position.play(move)
+            moves.append(move)
+            if position.is_terminal():
+                break
+        else:
+            return moves
+
+
+def play_game(task: dict) -> dict:
+    """Plays one game of the engines of task from its opening, module level for the pool."""
+    start = time.monotonic()
+    engines = {CROSS: create_engine(task["cross"]), ZERO: create_engine(task["zero"])}
+    position = Position()
+    moves = [Move.from_string(move) for move in task["opening"]]
+    for move in moves:
+        position = position.play(move)
+
+    while not position.is_terminal():
+        move = engines[position.player].search(position, task["move_time"])
+        position = position.play(move)
+        moves.append(move)
+
+    for engine in engines.values():
+        if hasattr(engine, "close"):
+            engine.close()
+    return {
+        "game": task["game"],
+        "cross": task["cross"],
+        "zero": task["zero"],
+        "opening": task["opening"],
+        "moves": [str(move) for move in moves],
+        "result": RESULT_NAMES[position.result()],
+        "seconds": round(time.monotonic() - start, 3),
+    }
+
+
+def schedule(engines: list, games: int, opening_plies: int, move_time: float, seed: int) -> list:
+    """
+    games games for every pair of engines. Every random opening is
+    played twice with the colors swapped, so neither side profits from
+    a lucky opening or from moving first.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for first, second in itertools.combinations(engines, 2):
+        for i in range(games):
+            if i % 2 == 0:
+                opening = [str(move) for move in random_opening(rng, opening_plies)]
+            cross, zero = (first, second) if i % 2 == 0 else (second, first)
+            tasks.append({
+                "game": len(tasks),
+                "cross": cross,
+                "zero": zero,
+                "opening": opening,
+                "move_time": move_time,
+            })
+    return tasks
+
+
+def read_results(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def elo(score: float) -> float:
+    """Elo difference which makes score the expected score."""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1) + 0.0
+
+
+def wilson_interval(score: float, games: int) -> (float, float):
+    """
+    95% Wilson score interval of a score over games games, draws count
+    as half a win. Unlike the normal approximation it keeps a width when
+    all games ended alike, e.g. 4-0 gives about [0.51, 1].
+    """
+    z2 = Z_95 ** 2
+    center = (score + z2 / (2 * games)) / (1 + z2 / games)
+    margin = Z_95 / (1 + z2 / games) * math.sqrt(
+        score * (1 - score) / games + z2 / (4 * games ** 2)
+    )
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+def summary(results: list, first: str, second: str) -> dict:
+    """Wins, draws and losses of first against second, its score and Elo with 95% intervals."""
+    wins = draws = losses = 0
+    for result in results:
+        if {result["cross"], result["zero"]} != {first, second}:
+            continue
+        if result["result"] == "draw":
+            draws += 1
+        elif result[result["result"]] == first:
+            wins += 1
+        else:
+            losses += 1
+
+    games = wins + draws + losses
+    if not games:
+        return {"games": 0}
+    score = (wins + draws / 2) / games
+    low, high = wilson_interval(score, games)
+    return {
+        "games": games,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "score": score,
+        "score_interval": (low, high),
+        "elo": elo(score),
+        "elo_interval": (elo(low), elo(high)),
+    }
+
+
+def print_table(results: list, engines: list) -> None:
+    print(f"{'engine':<32} {'opponent':<32} {'W':>5} {'D':>5} {'L':>5} {'score':>17} {'elo':>20}")
+    for first, second in itertools.combinations(engines, 2):
+        stats = summary(results, first, second)
+        if not stats["games"]:
+            continue
+        low, high = stats["score_interval"]
+        elo_low, elo_high = stats["elo_interval"]
+        print(
+            f"{first:<32} {second:<32} {stats['wins']:>5} {stats['draws']:>5} {stats['losses']:>5}"
+            f" {stats['score']:>6.3f} [{low:.3f},{high:.3f}]"
+            f" {stats['elo']:>+7.0f} [{elo_low:+.0f},{elo_high:+.0f}]"
+        )
+
+
+def run(
+        engines: list,
+        games: int,
+        output: str,
+        opening_plies: int = 4,
+        move_time: float = 0.1,
+        processes: int | None = None,
+        seed: int = 0,
+) -> list:
+    """
+    Plays the tournament on a process pool and appends every finished
+    game to the JSONL file output right away. Games already in output
+    are not played again, so an interrupted run continues where it
+    stopped.
+    """
+    if len(set(engines)) != len(engines):
+        raise ValueError("engine specs must be different")
+    for spec in engines:
+        parse_engine(spec)
+    results = read_results(output)
+    done = {result["game"] for result in results}
+    tasks = [
+        task for task in schedule(engines, games, opening_plies, move_time, seed)
+        if task["game"] not in done
+    ]
+
+    start = time.monotonic()
+    with multiprocessing.Pool(processes) as pool, open(output, "a") as results_file:
+        for played, result in enumerate(pool.imap_unordered(play_game, tasks), 1):
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            results.append(result)
+            elapsed = time.monotonic() - start
+            print(
+                f"game {result['game']}: {result['cross']} - {result['zero']} {result['result']}, "
+                f"{played}/{len(tasks)}, {played / elapsed:.2f} games/s"
+            )
+    if tasks:
+        print(f"{len(tasks)} games in {time.monotonic() - start:.1f} s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Self-play tournament between engines.")
+    parser.add_argument(
+        "engines", nargs="+", help='engine specs like "alphabeta:max_depth=2" or "mcts"',
+    )
+    parser.add_argument("-g", "--games", type=int, default=100, help="games per pair of engines")
+    parser.add_argument("-o", "--output", default="tournament.jsonl")
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--move-time", type=float, default=0.1, help="seconds per move")
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if len(args.engines) < 2:
+        parser.error("a tournament needs at least two engines")
+
+    results = run(
+        args.engines,
+        args.games,
+        args.output,
+        args.opening_plies,
+        args.move_time,
+        args.processes,
+        args.seed,
+    )
+    print_table(results, args.engines)
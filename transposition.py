@@ -0,0 +1,73 @@
+from board import Board, INVERSE_SYMMETRIES, transform_move
+from rules import Move
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results keyed by the canonical Zobrist
+    hash of a position, so all 8 symmetric variants share one entry.
+    Best moves are stored in the canonical frame and mapped back to the
+    probing position. A slot is replaced by an entry of at least the
+    same depth or by any entry of a newer search.
+    """
+
+    def __init__(self, size_bits: int = 20) -> None:
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.bounds = [EXACT] * self.size
+        self.values = [0] * self.size
+        self.moves = [None] * self.size
+        self.ages = [0] * self.size
+        self.age = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        self.age += 1
+
+    def clear(self) -> None:
+        self.__init__(self.size.bit_length() - 1)
+
+    def probe(self, board: Board) -> tuple | None:
+        """(depth, bound, value, best move) stored for board or None."""
+        key, symmetry = board.canonical()
+        slot = key & self.mask
+        if self.keys[slot] != key:
+            return None
+
+        self.hits += 1
+        move = self.moves[slot]
+        if move is not None:
+            move = Move(*transform_move(*move, INVERSE_SYMMETRIES[symmetry]))
+        return self.depths[slot], self.bounds[slot], self.values[slot], move
+
+    def store(
+            self,
+            board: Board,
+            depth: int,
+            bound: int,
+            value: int,
+            move: Move | None,
+    ) -> None:
+        key, symmetry = board.canonical()
+        slot = key & self.mask
+        if (
+            self.keys[slot] is not None
+            and self.ages[slot] == self.age
+            and self.depths[slot] > depth
+        ):
+            return
+
+        self.stores += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.values[slot] = value
+        self.moves[slot] = None if move is None else transform_move(*move, symmetry)
+        self.ages[slot] = self.age
@@ -0,0 +1,146 @@
+import concurrent.futures
+import multiprocessing
+import typing
+
+from rules import Move, Position
+
+class StopFlag:
+    """
+    stop_event of the engine of a worker. Every submitted search gets
+    the next generation number and is stopped as soon as the worker's
+    generation has moved past it, so cancelling belongs to one search:
+    a search cancelled while still queued stops right when it starts,
+    and no search can reset the flag of another. Both numbers live in
+    shared memory and can be handed to child processes on creation.
+    """
+
+    def __init__(self) -> None:
+        # generation of the latest search, written by the worker's owner
+        self.generation = multiprocessing.RawValue("q", 0)
+        # generation of the search the engine runs
+        self.running = multiprocessing.RawValue("q", 0)
+
+    def is_set(self) -> bool:
+        return self.running.value != self.generation.value
+
+
+# engine of a worker process, created by _init_process
+_engine = None
+
+
+def _init_process(engine_factory: typing.Callable, stop_flag: StopFlag) -> None:
+    global _engine
+    _engine = engine_factory()
+    _engine.stop_event = stop_flag
+
+
+def _search_in_process(cross: int, zero: int, ponder: bool, generation: int) -> Move | None:
+    return _search_in_thread(_engine, Position(cross, zero), ponder, generation)
+
+
+def _search_in_thread(engine, position: Position, ponder: bool, generation: int) -> Move | None:
+    engine.stop_event.running.value = generation
+    if engine.stop_event.is_set():
+        # cancelled before it started
+        return None
+    if ponder:
+        return engine.ponder(position)
+    return engine.search(position)
+
+
+class EngineWorker:
+    """
+    Runs engine searches off the main thread so the game loop keeps its
+    frame rate. start() submits a search and returns its future, the
+    loop calls poll() every frame until the move is ready. cancel()
+    stops the search through the engine's stop_event, a StopFlag, and
+    discards its result. ponder() lets the engine search the opponent's
+    position until the next start() or cancel(), filling the state it
+    reuses for the following search.
+
+    engine_factory is called once in the worker and must be picklable
+    when processes is True (e.g. a class or a functools.partial). A
+    worker process keeps its engine, and with it the transposition
+    table, for the whole game.
+
+    on_done is called without arguments, from another thread, whenever
+    a search finishes, so a loop waiting for events can be woken up.
+    """
+
+    def __init__(
+            self,
+            engine_factory: typing.Callable,
+            processes: bool = True,
+            on_done: typing.Callable | None = None,
+    ) -> None:
+        self.processes = processes
+        self.on_done = on_done
+        self.stop_flag = StopFlag()
+        self._generation = 0
+        if processes:
+            self.engine = None
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                1, initializer=_init_process, initargs=(engine_factory, self.stop_flag),
+            )
+        else:
+            self.engine = engine_factory()
+            self.engine.stop_event = self.stop_flag
+            self._executor = concurrent.futures.ThreadPoolExecutor(1)
+        self._future = None
+        self.position = None
+        self.pondering = False
+
+    @property
+    def thinking(self) -> bool:
+        return self._future is not None and not self.pondering
+
+    def start(self, position: Position) -> concurrent.futures.Future:
+        return self._submit(position, False)
+
+    def ponder(self, position: Position) -> concurrent.futures.Future:
+        return self._submit(position, True)
+
+    def _submit(self, position: Position, ponder: bool) -> concurrent.futures.Future:
+        self.cancel()
+        self.position = position
+        self.pondering = ponder
+        generation = self._next_generation()
+        if self.processes:
+            self._future = self._executor.submit(
+                _search_in_process, position.cross, position.zero, ponder, generation
+            )
+        else:
+            self._future = self._executor.submit(
+                _search_in_thread, self.engine, position, ponder, generation
+            )
+        if self.on_done is not None:
+            self._future.add_done_callback(lambda future: self.on_done())
+        return self._future
+
+    def poll(self) -> Move | None:
+        """The found move once the search is finished, None before that."""
+        if not self.thinking or not self._future.done():
+            return None
+        future, self._future = self._future, None
+        return future.result()
+
+    def cancel(self) -> None:
+        if self._future is None:
+            return
+        # a search that has not started yet is dropped by the executor if
+        # it can, otherwise it or the running one sees its generation is
+        # over and returns early
+        self._future.cancel()
+        self._next_generation()
+        self._future = None
+        self.position = None
+        self.pondering = False
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        self.stop_flag.generation.value = self._generation
+        return self._generation
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(cancel_futures=True)